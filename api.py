@@ -102,7 +102,7 @@ async def search(request: QueryRequest):
     try:
         start_time = time.time()
         
-        result = search_manager.search_and_generate(
+        result = await search_manager.a_search_and_generate(
             query=request.query,
             store_name=request.store_name,
             temperature=request.temperature,
@@ -2,6 +2,8 @@
 System prompts and templates for the RAG system.
 Optimized to reduce hallucination, ensure grounded answers, and match response language to query.
 """
+from functools import lru_cache
+from typing import Final, List, Optional
 
 class PromptTemplates:
     """Collection of prompt templates for different use cases."""
@@ -61,12 +63,76 @@ FORMAT YOUR ANSWER:
 5. Srtictly don't include Sources
 """
 
-    @classmethod
-    def format_search_prompt(cls, query: str) -> str:
+    BATCH_SEARCH_PROMPT_TEMPLATE = """Answer each of the following questions independently using ONLY information from the provided documents.
+
+Questions:
+{questions}
+
+INSTRUCTIONS:
+1. Answer every question, in order, starting each answer on a new line with its number in square brackets, e.g. [1]
+2. Give a DIRECT answer first (number, name, fact, etc.)
+3. Respond in the SAME LANGUAGE as each question
+4. If the information for a question is not in the documents, clearly say so for that question
+5. Be specific and concise
+6. Srtictly don't include Sources
+"""
+
+    BATCH_QUESTION_ANSWERING_PROMPT = """Answer each of the following questions using ONLY the provided documents.
+
+Questions:
+{questions}
+
+FORMAT YOUR ANSWERS:
+1. Answer every question, in order, starting each answer on a new line with its number in square brackets, e.g. [1]
+2. Start each answer with the direct answer (number, name, or key fact)
+3. Add 1-2 sentences of context if helpful
+4. Use the SAME LANGUAGE as each question
+5. If information is not found, say: "This information is not available in the documents."
+6. Srtictly don't include Sources
+"""
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def format_search_prompt(query: str) -> str:
         """Format the search prompt with the user query."""
-        return cls.SEARCH_PROMPT_TEMPLATE.format(query=query)
+        return _SEARCH_PREFIX + query + _SEARCH_SUFFIX
     
-    @classmethod
-    def format_qa_prompt(cls, query: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def format_qa_prompt(query: str) -> str:
         """Format the question-answering prompt with the user query."""
-        return cls.QUESTION_ANSWERING_PROMPT.format(query=query)
\ No newline at end of file
+        return _QA_PREFIX + query + _QA_SUFFIX
+    
+    @classmethod
+    def format_summary_prompt(cls, focus_topic: Optional[str] = None) -> str:
+        """Format the summarization prompt, optionally focused on a topic."""
+        if not focus_topic:
+            return SUMMARIZATION_PROMPT
+        return _SUMMARY_FOCUS_PREFIX + focus_topic
+    
+    @classmethod
+    def format_batch_search_prompt(cls, queries: List[str]) -> str:
+        """Format several numbered questions into a single search prompt."""
+        questions = "\n".join(f"[{i}] {query}" for i, query in enumerate(queries, 1))
+        return _BATCH_PREFIX + questions + _BATCH_SUFFIX
+    
+    @classmethod
+    def format_batch_qa_prompt(cls, questions: List[str]) -> str:
+        """Format several numbered questions into a single question-answering prompt."""
+        numbered = "\n".join(f"[{i}] {question}" for i, question in enumerate(questions, 1))
+        return _BATCH_QA_PREFIX + numbered + _BATCH_QA_SUFFIX
+
+# Module-level aliases of the templates; global lookups skip the class attribute resolution
+RAG_SYSTEM_PROMPT: Final[str] = PromptTemplates.RAG_SYSTEM_PROMPT
+SEARCH_PROMPT_TEMPLATE: Final[str] = PromptTemplates.SEARCH_PROMPT_TEMPLATE
+SUMMARIZATION_PROMPT: Final[str] = PromptTemplates.SUMMARIZATION_PROMPT
+QUESTION_ANSWERING_PROMPT: Final[str] = PromptTemplates.QUESTION_ANSWERING_PROMPT
+BATCH_SEARCH_PROMPT_TEMPLATE: Final[str] = PromptTemplates.BATCH_SEARCH_PROMPT_TEMPLATE
+BATCH_QUESTION_ANSWERING_PROMPT: Final[str] = PromptTemplates.BATCH_QUESTION_ANSWERING_PROMPT
+
+# Templates pre-split around their placeholder so formatting is a plain concatenation
+_SEARCH_PREFIX, _SEARCH_SUFFIX = SEARCH_PROMPT_TEMPLATE.split("{query}")
+_QA_PREFIX, _QA_SUFFIX = QUESTION_ANSWERING_PROMPT.split("{query}")
+_BATCH_PREFIX, _BATCH_SUFFIX = BATCH_SEARCH_PROMPT_TEMPLATE.split("{questions}")
+_BATCH_QA_PREFIX, _BATCH_QA_SUFFIX = BATCH_QUESTION_ANSWERING_PROMPT.split("{questions}")
+_SUMMARY_FOCUS_PREFIX = SUMMARIZATION_PROMPT + "\n\nFocus particularly on information related to: "
@@ -2,26 +2,34 @@
 Configuration management for Google File Search RAG system.
 """
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
 from typing import Optional
 
-# Load environment variables
-load_dotenv()
-
 class Settings:
     """Configuration settings for the RAG system."""
     
     def __init__(self):
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        self.default_model = os.getenv('DEFAULT_MODEL', 'gemini-2.5-flash')
-        self.default_store_name = os.getenv('DEFAULT_STORE_NAME', 'rag-documents')
+        # Bind the environment mapping once instead of resolving os.getenv per key
+        env = os.environ
+        
+        # Always load .env: it may hold other settings even when the API key is
+        # exported, and load_dotenv never overrides variables already set
+        from dotenv import load_dotenv
+        load_dotenv()
+        
+        self.api_key = env.get('GEMINI_API_KEY')
+        self.default_model = env.get('DEFAULT_MODEL', 'gemini-2.5-flash')
+        self.default_store_name = env.get('DEFAULT_STORE_NAME', 'rag-documents')
         
         # Chunking configuration
-        self.max_tokens_per_chunk = int(os.getenv('MAX_TOKENS_PER_CHUNK', 500))
-        self.max_overlap_tokens = int(os.getenv('MAX_OVERLAP_TOKENS', 50))
+        self.max_tokens_per_chunk = int(env.get('MAX_TOKENS_PER_CHUNK', 500))
+        self.max_overlap_tokens = int(env.get('MAX_OVERLAP_TOKENS', 50))
         
         # File limits
-        self.max_file_size_mb = int(os.getenv('MAX_FILE_SIZE_MB', 100))
+        self.max_file_size_mb = int(env.get('MAX_FILE_SIZE_MB', 100))
+        
+        # Concurrency limit for parallel uploads (keeps requests within API quotas)
+        self.max_upload_workers = int(env.get('MAX_UPLOAD_WORKERS', 8))
         
         # Validate required settings
         if not self.api_key or self.api_key == 'your_api_key_here':
@@ -41,5 +49,18 @@ class Settings:
             }
         }
 
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the shared settings instance, creating it on first use.
+    
+    Environment parsing and API key validation are deferred until a caller
+    actually needs configuration, instead of running at import time.
+    """
+    return Settings()
+
+def __getattr__(name: str):
+    """Keep `from config.settings import settings` working lazily."""
+    if name == 'settings':
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,13 @@
+"""
+Shared output helpers for the example scripts.
+"""
+
+def truncate(text: str, limit: int = 200) -> str:
+    """Shorten text to `limit` characters, appending '...' only when it was cut."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+def render_citations(citations, limit: int = 10) -> str:
+    """Render the first `limit` citations as a numbered list of file names."""
+    return "\n".join(
+        f"  {i}. {citation.file_name}" for i, citation in enumerate(citations[:limit], 1)
+    )
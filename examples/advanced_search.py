@@ -1,16 +1,64 @@
 """
 Advanced search patterns and features demonstration.
 """
+import logging
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-# Add the parent directory to the path to import modules
-sys.path.append(str(Path(__file__).parent.parent))
+# Add the parent directory to the path to import modules; skipped when it is
+# already importable (e.g. `python -m examples.advanced_search` from the project root)
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from src.file_search_client import FileSearchClient
 from src.document_processor import DocumentProcessor
 from src.search_manager import SearchManager
+from config.settings import get_settings
+from examples._util import truncate
+
+logger = logging.getLogger(__name__)
+
+# (key, display name) of the stores the demo creates for each document type
+STORE_SPECS = (
+    ("technical-docs", "technical-documentation"),
+    ("research-papers", "research-publications"),
+    ("user-manuals", "user-documentation"),
+)
+
+# Ordered (predicate(name_lower, suffix_lower), (store_key, doc_type, category)) upload routing rules
+CATEGORY_RULES = (
+    (lambda name, suffix: "manual" in name, ("user-manuals", "manual", "user-documentation")),
+    (lambda name, suffix: "research" in name or suffix == ".pdf", ("research-papers", "research", "scientific")),
+)
+DEFAULT_CATEGORY = ("technical-docs", "technical", "reference")
+
+DEMO_FEATURES = (
+    "Multi-store search",
+    "Metadata-rich uploads",
+    "Focused Q&A and summarization",
+    "Batch processing",
+    "Model comparison",
+    "Response formatting",
+    "Store management",
+)
+
+def _create_or_get_store(client: FileSearchClient, display_name: str):
+    """Create a store, falling back to an existing store with the same name."""
+    try:
+        store_id = client.create_store(display_name)
+        print(f"📂 Created store: {display_name}")
+        return store_id
+    except Exception as e:
+        # Try to find existing store
+        store_id = client.get_store_by_name(display_name)
+        if store_id:
+            print(f"📂 Using existing store: {display_name}")
+        else:
+            print(f"⚠️  Could not create store {display_name}: {e}")
+        return store_id
 
 def advanced_search_demo():
     """
@@ -25,28 +73,18 @@ def advanced_search_demo():
         doc_processor = DocumentProcessor(client)
         search_manager = SearchManager(client)
         
-        # Create multiple stores for different document types
-        stores = {
-            "technical-docs": "technical-documentation",
-            "research-papers": "research-publications", 
-            "user-manuals": "user-documentation"
+        # Create (or look up) one store per document type, concurrently
+        with ThreadPoolExecutor(max_workers=len(STORE_SPECS)) as executor:
+            store_futures = {
+                key: executor.submit(_create_or_get_store, client, display_name)
+                for key, display_name in STORE_SPECS
+            }
+        store_ids = {
+            key: store_id
+            for key, future in store_futures.items()
+            if (store_id := future.result())
         }
         
-        store_ids = {}
-        for key, display_name in stores.items():
-            try:
-                store_id = client.create_store(display_name)
-                store_ids[key] = store_id
-                print(f"📂 Created store: {display_name}")
-            except Exception as e:
-                # Try to find existing store
-                store_id = client.get_store_by_name(display_name)
-                if store_id:
-                    store_ids[key] = store_id
-                    print(f"📂 Using existing store: {display_name}")
-                else:
-                    print(f"⚠️  Could not create store {display_name}: {e}")
-        
         if not store_ids:
             print("❌ No stores available for demo")
             return
@@ -55,45 +93,55 @@ def advanced_search_demo():
         print("\n📤 Demonstrating metadata-rich document uploads...")
         
         data_dir = Path(__file__).parent.parent / "data" / "documents"
+        uploaded_counts = {}
         if data_dir.exists() and any(data_dir.iterdir()):
             
             # Upload with different metadata for categorization
-            for file_path in data_dir.glob("*"):
-                if file_path.is_file() and file_path.suffix.lower() in doc_processor.SUPPORTED_FORMATS:
+            uploads = []
+            # os.scandir reuses directory entry type info instead of stat-ing each path
+            for entry in os.scandir(data_dir):
+                suffix = os.path.splitext(entry.name)[1].lower()
+                if suffix in doc_processor.SUPPORTED_SUFFIXES and entry.is_file():
+                    file_path = Path(entry.path)
                     
                     # Determine store based on filename or extension
-                    if "manual" in file_path.name.lower():
-                        store_key = "user-manuals"
-                        doc_type = "manual"
-                        category = "user-documentation"
-                    elif "research" in file_path.name.lower() or file_path.suffix == ".pdf":
-                        store_key = "research-papers"
-                        doc_type = "research"
-                        category = "scientific"
-                    else:
-                        store_key = "technical-docs"
-                        doc_type = "technical"
-                        category = "reference"
+                    name_lower = entry.name.lower()
+                    store_key, doc_type, category = next(
+                        (target for matches, target in CATEGORY_RULES if matches(name_lower, suffix)),
+                        DEFAULT_CATEGORY
+                    )
                     
                     if store_key in store_ids:
-                        try:
-                            doc_processor.upload_document(
-                                file_path=str(file_path),
-                                store_name=store_ids[store_key],
-                                document_type=doc_type,
-                                category=category,
-                                tags=["demo", "advanced", doc_type],
-                                custom_fields={
-                                    "upload_demo": "advanced_features",
-                                    "version": 1.0
-                                }
-                            )
-                        except Exception as e:
-                            print(f"⚠️  Upload error for {file_path.name}: {e}")
-        
-        # Wait for indexing
-        import time
-        time.sleep(5)
+                        uploads.append((file_path, store_key, doc_type, category))
+            
+            # Uploads are network-bound, so run them concurrently
+            with ThreadPoolExecutor(max_workers=get_settings().max_upload_workers) as executor:
+                upload_futures = {
+                    executor.submit(
+                        doc_processor.upload_document,
+                        file_path=str(file_path),
+                        store_name=store_ids[store_key],
+                        custom_metadata=[
+                            {'key': 'document_type', 'string_value': doc_type},
+                            {'key': 'category', 'string_value': category},
+                            {'key': 'tags', 'string_list_value': {'values': ["demo", "advanced", doc_type]}},
+                            {'key': 'upload_demo', 'string_value': 'advanced_features'},
+                            {'key': 'version', 'numeric_value': 1.0}
+                        ]
+                    ): (file_path, store_key)
+                    for file_path, store_key, doc_type, category in uploads
+                }
+                for future in as_completed(upload_futures):
+                    file_path, store_key = upload_futures[future]
+                    try:
+                        future.result()
+                        uploaded_counts[store_key] = uploaded_counts.get(store_key, 0) + 1
+                    except Exception as e:
+                        print(f"⚠️  Upload error for {file_path.name}: {e}")
+        
+        # Wait until uploaded documents are indexed in each store
+        for store_key, count in uploaded_counts.items():
+            client.wait_for_indexing(store_ids[store_key], expected_count=count)
         
         # Demonstrate advanced search patterns
         print("\n🔍 Advanced Search Patterns:")
@@ -106,8 +154,8 @@ def advanced_search_demo():
                 query="What information is available about system features?",
                 store_names=list(store_ids.values())
             )
-            print(f"Answer: {response.answer[:200]}...")
-            print(f"Sources from {len(set(c.file_name for c in response.citations))} different files")
+            print(f"Answer: {truncate(response.answer)}")
+            print(f"Sources from {len({c.file_name for c in response.citations})} different files")
         
         # 2. Focused question answering
         print("\n2. Focused Question Answering")
@@ -117,7 +165,7 @@ def advanced_search_demo():
             store_name=first_store,
             context="Focus on technical capabilities and use cases"
         )
-        print(f"Q&A Answer: {qa_response.answer[:200]}...")
+        print(f"Q&A Answer: {truncate(qa_response.answer)}")
         
         # 3. Topic-focused summarization
         print("\n3. Topic-Focused Summarization")
@@ -125,7 +173,7 @@ def advanced_search_demo():
             store_name=first_store,
             focus_topic="technical features and capabilities"
         )
-        print(f"Focused Summary: {summary_response.answer[:200]}...")
+        print(f"Focused Summary: {truncate(summary_response.answer)}")
         
         # 4. Batch query processing
         print("\n4. Batch Query Processing")
@@ -135,34 +183,30 @@ def advanced_search_demo():
             "What are the supported file formats?"
         ]
         
-        batch_results = search_manager.batch_search(
+        batch_results = search_manager.batch_prompt(
             queries=batch_queries,
-            store_name=first_store,
-            delay_seconds=0.5
+            store_name=first_store
         )
         
         for i, result in enumerate(batch_results, 1):
-            print(f"Batch {i}: {result.answer[:100]}... ({len(result.citations)} sources)")
+            print(f"Batch {i}: {truncate(result.answer, 100)} ({len(result.citations)} sources)")
         
         # 5. Model comparison
         print("\n5. Model Comparison")
-        original_model = search_manager.model_name
         
         # Test with different models if available
         models_to_test = ["gemini-2.5-flash", "gemini-2.5-pro"]
         test_query = "Explain the key benefits of this system"
         
         for model in models_to_test:
-            if search_manager.set_model(model):
-                response = search_manager.search_and_generate(
+            model_manager = search_manager.get_manager_for(model)
+            if model_manager:
+                response = model_manager.search_and_generate(
                     query=test_query,
                     store_name=first_store,
                     temperature=0.2
                 )
-                print(f"{model}: {response.answer[:150]}...")
-        
-        # Restore original model
-        search_manager.set_model(original_model)
+                print(f"{model}: {truncate(response.answer, 150)}")
         
         # 6. Response formatting demonstration
         print("\n6. Response Formatting Options")
@@ -174,7 +218,7 @@ def advanced_search_demo():
         formatter = search_manager.response_handler
         
         print("Full formatted response:")
-        print(formatter.format_response(response, include_citations=True)[:300] + "...")
+        print(truncate(formatter.format_response(response, include_citations=True), 300))
         
         print("\nCitations only:")
         print(formatter.format_citations_only(response.citations))
@@ -196,20 +240,12 @@ def advanced_search_demo():
         print(f"Input limit: {model_info.get('input_token_limit', 'Unknown')} tokens")
         print(f"Output limit: {model_info.get('output_token_limit', 'Unknown')} tokens")
         
-        print(f"\n✅ Advanced features demo completed!")
-        print(f"Explored features:")
-        print(f"  ✓ Multi-store search")
-        print(f"  ✓ Metadata-rich uploads")
-        print(f"  ✓ Focused Q&A and summarization")
-        print(f"  ✓ Batch processing")
-        print(f"  ✓ Model comparison")
-        print(f"  ✓ Response formatting")
-        print(f"  ✓ Store management")
+        print("\n✅ Advanced features demo completed!\nExplored features:\n"
+              + "\n".join(f"  ✓ {feature}" for feature in DEMO_FEATURES))
         
     except Exception as e:
         print(f"❌ Advanced demo failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Advanced demo failed")
 
 def cleanup_demo_stores():
     """Clean up demo stores (optional)."""
@@ -217,18 +253,19 @@ def cleanup_demo_stores():
     
     try:
         client = FileSearchClient()
-        stores_to_cleanup = [
-            "technical-documentation",
-            "research-publications", 
-            "user-documentation",
-            "demo-rag-store"
-        ]
+        stores_to_cleanup = {display_name for _, display_name in STORE_SPECS}
+        stores_to_cleanup.add("demo-rag-store")
         
         existing_stores = client.list_stores()
-        for store in existing_stores:
-            if store['display_name'] in stores_to_cleanup:
+        doomed = [store for store in existing_stores if store['display_name'] in stores_to_cleanup]
+        
+        # Each deletion is one independent RPC, so issue them concurrently
+        with ThreadPoolExecutor(max_workers=min(16, len(doomed)) or 1) as executor:
+            delete_futures = {executor.submit(client.delete_store, store['name']): store for store in doomed}
+            for future in as_completed(delete_futures):
+                store = delete_futures[future]
                 try:
-                    client.delete_store(store['name'])
+                    future.result()
                     print(f"✅ Deleted store: {store['display_name']}")
                 except Exception as e:
                     print(f"⚠️  Could not delete {store['display_name']}: {e}")
@@ -237,8 +274,6 @@ def cleanup_demo_stores():
         print(f"❌ Cleanup error: {e}")
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1 and sys.argv[1] == "cleanup":
         cleanup_demo_stores()
     else:
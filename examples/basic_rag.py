@@ -2,16 +2,48 @@
 Basic RAG example using Google File Search API.
 """
 import sys
-import os
 from pathlib import Path
 
-# Add the parent directory to the path to import modules
-sys.path.append(str(Path(__file__).parent.parent))
+# Add the parent directory to the path to import modules; skipped when it is
+# already importable (e.g. `python -m examples.basic_rag` from the project root)
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from src.file_search_client import FileSearchClient
 from src.document_processor import DocumentProcessor
 from src.search_manager import SearchManager
-from src.response_handler import ResponseHandler
+from examples._util import render_citations, truncate
+
+# Sample document written when data/documents is empty, kept as bytes so it is written without encoding
+_SAMPLE_CONTENT_BYTES = b"""
+# Sample Document for RAG Testing
+
+## Introduction
+This is a sample document to demonstrate the Google File Search RAG system.
+The system can process various document formats including PDF, TXT, DOCX, HTML, and Markdown.
+
+## Key Features
+1. **Semantic Search**: Uses Google's embedding models for intelligent document retrieval
+2. **Citation Support**: Provides source attribution for generated answers
+3. **Multi-format Support**: Handles various document types automatically
+4. **No Infrastructure**: No need for vector databases or custom embeddings
+
+## Technical Details
+The File Search API handles document chunking, indexing, and embedding generation automatically.
+It supports files up to 100MB and PDFs up to 1000 pages.
+
+## Use Cases
+- Knowledge base search
+- Document Q&A systems
+- Research assistance
+- Content summarization
+- Technical documentation queries
+
+## Conclusion
+This RAG system provides enterprise-grade semantic search capabilities
+without the complexity of managing vector databases or embedding models.
+"""
 
 def basic_rag_example():
     """
@@ -57,55 +89,26 @@ def basic_rag_example():
             sample_doc = data_dir / "sample_document.txt"
             data_dir.mkdir(parents=True, exist_ok=True)
             
-            sample_content = """
-# Sample Document for RAG Testing
-
-## Introduction
-This is a sample document to demonstrate the Google File Search RAG system.
-The system can process various document formats including PDF, TXT, DOCX, HTML, and Markdown.
-
-## Key Features
-1. **Semantic Search**: Uses Google's embedding models for intelligent document retrieval
-2. **Citation Support**: Provides source attribution for generated answers
-3. **Multi-format Support**: Handles various document types automatically
-4. **No Infrastructure**: No need for vector databases or custom embeddings
-
-## Technical Details
-The File Search API handles document chunking, indexing, and embedding generation automatically.
-It supports files up to 100MB and PDFs up to 1000 pages.
-
-## Use Cases
-- Knowledge base search
-- Document Q&A systems
-- Research assistance
-- Content summarization
-- Technical documentation queries
-
-## Conclusion
-This RAG system provides enterprise-grade semantic search capabilities
-without the complexity of managing vector databases or embedding models.
-"""
-            
-            sample_doc.write_text(sample_content)
-            print(f"📄 Created sample document: {sample_doc}")
+            if not sample_doc.exists():
+                sample_doc.write_bytes(_SAMPLE_CONTENT_BYTES)
+                print(f"📄 Created sample document: {sample_doc}")
         
         # Upload documents from the data directory
         print(f"\n📤 Uploading documents from {data_dir}...")
+        # Re-runs skip documents already uploaded with the same content
         operations = doc_processor.upload_directory(
             directory_path=str(data_dir),
             store_name=store_id,
-            document_type="sample",
-            category="demo"
+            skip_unchanged=True
         )
         
-        if not operations:
+        if not operations and not client.list_files_in_store(store_id):
             print("❌ No documents were uploaded. Please add some files to data/documents/")
             return
         
-        # Wait a moment for indexing
+        # Wait until the uploaded documents are indexed
         print("⏳ Waiting for document indexing...")
-        import time
-        time.sleep(3)
+        client.wait_for_indexing(store_id, expected_count=len(operations))
         
         # Example queries
         queries = [
@@ -118,32 +121,24 @@ without the complexity of managing vector databases or embedding models.
         print(f"\n🔍 Testing {len(queries)} sample queries:")
         print("-" * 40)
         
-        for i, query in enumerate(queries, 1):
+        # Answer all sample queries with a single batched request
+        responses = search_manager.batch_prompt(queries, store_name=store_id)
+        
+        for i, (query, response) in enumerate(zip(queries, responses), 1):
             print(f"\n{i}. Query: {query}")
+            print(f"Answer: {truncate(response.answer)}")
             
-            try:
-                response = search_manager.search_and_generate(
-                    query=query,
-                    store_name=store_id
-                )
-                
-                print(f"Answer: {response.answer[:200]}..." if len(response.answer) > 200 else f"Answer: {response.answer}")
-                
-                if response.citations:
-                    print(f"Sources: {len(response.citations)} found")
-                    for j, citation in enumerate(response.citations[:2], 1):  # Show first 2 citations
-                        print(f"  {j}. {citation.file_name}")
-                else:
-                    print("Sources: None found")
-                    
-            except Exception as e:
-                print(f"❌ Error processing query: {e}")
+            if response.citations:
+                print(f"Sources: {len(response.citations)} found")
+                print(render_citations(response.citations, limit=2))  # Show first 2 citations
+            else:
+                print("Sources: None found")
         
         # Demonstrate summarization
         print(f"\n📋 Generating document summary...")
         try:
             summary_response = search_manager.summarize_documents(store_id)
-            print(f"Summary: {summary_response.answer[:300]}..." if len(summary_response.answer) > 300 else f"Summary: {summary_response.answer}")
+            print(f"Summary: {truncate(summary_response.answer, 300)}")
         except Exception as e:
             print(f"❌ Error generating summary: {e}")
         
@@ -157,17 +152,17 @@ without the complexity of managing vector databases or embedding models.
         except Exception as e:
             print(f"❌ Error listing files: {e}")
         
-        print(f"\n✅ Basic RAG example completed successfully!")
-        print(f"You can now:")
-        print(f"  1. Add more documents to data/documents/")
-        print(f"  2. Run custom queries using the SearchManager")
-        print(f"  3. Try the main.py CLI interface")
+        print("\n✅ Basic RAG example completed successfully!\n"
+              "You can now:\n"
+              "  1. Add more documents to data/documents/\n"
+              "  2. Run custom queries using the SearchManager\n"
+              "  3. Try the main.py CLI interface")
         
     except Exception as e:
         print(f"❌ Example failed: {e}")
-        print(f"Make sure you have:")
-        print(f"  1. Set GEMINI_API_KEY in your .env file")
-        print(f"  2. Installed dependencies: pip install -r requirements.txt")
+        print("Make sure you have:\n"
+              "  1. Set GEMINI_API_KEY in your .env file\n"
+              "  2. Installed dependencies: pip install -r requirements.txt")
 
 if __name__ == "__main__":
     basic_rag_example()
\ No newline at end of file
@@ -4,38 +4,86 @@ Main CLI interface for Google File Search RAG System.
 """
 import argparse
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 # Add the current directory to the path for imports
 sys.path.append(str(Path(__file__).parent))
 
-from src.file_search_client import FileSearchClient
-from src.document_processor import DocumentProcessor
-from src.search_manager import SearchManager
-from src.response_handler import ResponseHandler
-from config.settings import settings
+# Interactive-mode command words (matched against lowercased input)
+_QUIT_COMMANDS = frozenset({'quit', 'exit', 'q'})
+_SIMPLE_COMMANDS = frozenset({'help', 'stores'})
+_PREFIX_COMMANDS = ('switch ', 'summarize')
 
 class RAGSystemCLI:
     """Command-line interface for the RAG system."""
     
-    def __init__(self):
-        """Initialize the CLI with all components."""
+    def __init__(
+        self,
+        use_cache: bool = False,
+        cache_ttl: float = 3600,
+        context_cache_ttl: Optional[int] = None,
+        semantic_threshold: Optional[float] = None
+    ):
+        """
+        Initialize the CLI with all components.
+        
+        Args:
+            use_cache: Whether to reuse cached answers for repeated queries, stored on
+                disk in ~/.cache/rag/responses.sqlite3
+            cache_ttl: Seconds a cached answer stays valid
+            context_cache_ttl: Seconds to keep a Gemini context cache (disabled when None)
+            semantic_threshold: Similarity above which a rephrased query reuses an
+                earlier answer (semantic caching disabled when None)
+        """
+        # Imported here so `--help` and usage errors don't pay for loading the
+        # google-genai SDK and its dependencies
+        from src.file_search_client import FileSearchClient
+        from src.document_processor import DocumentProcessor
+        from src.search_manager import SearchManager
+        from src.response_handler import ResponseHandler
+        from src.response_cache import ResponseCache
+        from src.semantic_cache import SemanticCache
+        
         try:
             self.client = FileSearchClient()
             self.doc_processor = DocumentProcessor(self.client)
-            self.search_manager = SearchManager(self.client)
+            cache = ResponseCache(ttl_seconds=cache_ttl) if use_cache else None
+            semantic_cache = (
+                SemanticCache(self.client.get_client(), threshold=semantic_threshold)
+                if semantic_threshold is not None else None
+            )
+            self.search_manager = SearchManager(
+                self.client,
+                cache=cache,
+                context_cache_ttl=context_cache_ttl,
+                semantic_cache=semantic_cache
+            )
             self.response_handler = ResponseHandler()
+            # display name -> store resource ID, resolved once per process
+            self._store_id_cache = {}
             print("✅ RAG system initialized successfully!")
         except Exception as e:
             print(f"❌ Failed to initialize RAG system: {e}")
             print("Make sure you have set GEMINI_API_KEY in your .env file")
             sys.exit(1)
     
+    def _resolve_store(self, store_name: str) -> Optional[str]:
+        """Resolve a store display name to its resource ID, caching the result."""
+        store_id = self._store_id_cache.get(store_name)
+        if store_id is None:
+            store_id = self.client.get_store_by_name(store_name)
+            if store_id:
+                self._store_id_cache[store_name] = store_id
+        return store_id
+    
     def create_store(self, store_name: str) -> bool:
         """Create a new File Search store."""
         try:
             store_id = self.client.create_store(store_name)
+            self._store_id_cache[store_name] = store_id
             print(f"✅ Created store '{store_name}'")
             print(f"   Use this ID for future operations: {store_id}")
             return True
@@ -43,26 +91,35 @@ class RAGSystemCLI:
             print(f"❌ Failed to create store: {e}")
             return False
     
-    def list_stores(self):
+    def list_stores(self) -> bool:
         """List all available stores."""
         try:
             stores = self.client.list_stores()
             if not stores:
                 print("No stores found. Create one with 'create-store <name>'")
-                return
+                return True
             
-            print(f"📂 Found {len(stores)} stores:")
+            # Fetch every store's file listing concurrently
+            file_lists = self.client.list_files_in_stores([store['name'] for store in stores])
+            
+            # Write the listing in one call rather than one print per line
+            lines = [f"📂 Found {len(stores)} stores:"]
             for store in stores:
-                print(f"  - {store['display_name']}")
-                print(f"    ID: {store['name']}")
+                files = file_lists[store['name']]
+                lines.append(f"  - {store['display_name']}")
+                lines.append(f"    ID: {store['name']}")
+                lines.append(f"    Files: {len(files)}")
+            sys.stdout.write("\n".join(lines) + "\n")
+            return True
         except Exception as e:
             print(f"❌ Error listing stores: {e}")
+            return False
     
     def upload_file(self, file_path: str, store_name: str):
         """Upload a single file to a store."""
         try:
             # Resolve store name to resource ID
-            store_id = self.client.get_store_by_name(store_name)
+            store_id = self._resolve_store(store_name)
             if not store_id:
                 print(f"❌ Store '{store_name}' not found. Available stores:")
                 self.list_stores()
@@ -78,10 +135,16 @@ class RAGSystemCLI:
             print(f"❌ Failed to upload file: {e}")
             return False
     
-    def upload_directory(self, dir_path: str, store_name: str, recursive: bool = True):
-        """Upload all files in a directory to a store."""
+    def upload_directory(
+        self,
+        dir_path: str,
+        store_name: str,
+        recursive: bool = True,
+        concurrency: Optional[int] = None
+    ):
+        """Upload all files in a directory to a store, several files at a time."""
         try:
-            store_id = self.client.get_store_by_name(store_name)
+            store_id = self._resolve_store(store_name)
             if not store_id:
                 print(f"❌ Store '{store_name}' not found")
                 return False
@@ -89,7 +152,8 @@ class RAGSystemCLI:
             operations = self.doc_processor.upload_directory(
                 directory_path=dir_path,
                 store_name=store_id,
-                recursive=recursive
+                recursive=recursive,
+                max_workers=concurrency
             )
             print(f"✅ Uploaded {len(operations)} files from '{dir_path}'")
             return True
@@ -97,49 +161,88 @@ class RAGSystemCLI:
             print(f"❌ Failed to upload directory: {e}")
             return False
     
-    def search(self, query: str, store_name: str, format_output: bool = True):
-        """Perform a search query."""
+    def search(self, query: str, store_name: str, format_output: bool = True, stream: bool = False) -> bool:
+        """Perform a search query, optionally printing the answer as it streams in."""
         try:
             print(f"🔍 Searching in '{store_name}' for: {query}")
+            if stream:
+                print("\n" + "="*50)
+                response = self.search_manager.search_and_generate_stream(
+                    query=query,
+                    store_name=self._resolve_store(store_name) or store_name,
+                    on_text=self._write_stream_text
+                )
+                print()
+                if format_output and response.citations:
+                    print(self.response_handler.format_citations_only(response.citations))
+                return response.error is None
+            
             response = self.search_manager.search_and_generate(
                 query=query,
-                store_name=store_name
+                store_name=self._resolve_store(store_name) or store_name
             )
             
-            if format_output:
-                formatted = self.response_handler.format_response(response)
-                print("\n" + "="*50)
-                print(formatted)
-            else:
-                print(f"\nAnswer: {response.answer}")
-            
-            return response
+            self._print_search_response(response, format_output)
+            return response.error is None
         except Exception as e:
             print(f"❌ Search failed: {e}")
-            return None
+            return False
+    
+    @staticmethod
+    def _write_stream_text(text: str):
+        """Write a streamed piece of answer text immediately."""
+        sys.stdout.write(text)
+        sys.stdout.flush()
     
-    def ask_question(self, question: str, store_name: str):
+    def _print_search_response(self, response, format_output: bool = True):
+        """Print the answer of a search response."""
+        if format_output:
+            formatted = self.response_handler.format_response(response)
+            print("\n" + "="*50)
+            print(formatted)
+        else:
+            print(f"\nAnswer: {response.answer}")
+    
+    def ask_question(self, question: str, store_name: str) -> bool:
         """Ask a direct question."""
         try:
             response = self.search_manager.ask_question(
                 question=question,
-                store_name=store_name
+                store_name=self._resolve_store(store_name) or store_name
             )
             
             print("\n" + "="*50)
             print(f"Question: {question}")
             print(f"Answer: {response.answer}")
             
-            return response
+            return response.error is None
         except Exception as e:
             print(f"❌ Question failed: {e}")
-            return None
+            return False
     
-    def summarize(self, store_name: str, focus_topic: Optional[str] = None):
+    def ask_questions(self, questions: List[str], store_name: str) -> bool:
+        """Ask several direct questions in a single request."""
+        try:
+            responses = self.search_manager.ask_questions(
+                questions=questions,
+                store_name=self._resolve_store(store_name) or store_name
+            )
+            
+            for question, response in zip(questions, responses):
+                print("\n" + "="*50)
+                print(f"Question: {question}")
+                print(f"Answer: {response.answer}")
+            
+            return all(response.error is None for response in responses)
+        except Exception as e:
+            print(f"❌ Questions failed: {e}")
+            return False
+    
+    def summarize(self, store_name: str, focus_topic: Optional[str] = None) -> bool:
         """Generate a summary of documents in a store."""
         try:
             response = self.search_manager.summarize_documents(
-                store_name=store_name,
+                store_name=self._resolve_store(store_name) or store_name,
                 focus_topic=focus_topic
             )
             
@@ -155,32 +258,44 @@ class RAGSystemCLI:
                 for citation in response.citations:
                     print(f"  - {citation.file_name}")
             
-            return response
+            return response.error is None
         except Exception as e:
             print(f"❌ Summarization failed: {e}")
-            return None
+            return False
     
     def delete_store(self, store_name: str):
         """Delete a File Search store."""
         try:
-            store_id = self.client.get_store_by_name(store_name)
+            store_id = self._resolve_store(store_name)
             if not store_id:
                 print(f"❌ Store '{store_name}' not found")
                 return False
             
             self.client.delete_store(store_id)
+            self._store_id_cache = {
+                name: cached_id for name, cached_id in self._store_id_cache.items()
+                if cached_id != store_id
+            }
             print(f"✅ Deleted store '{store_name}'")
             return True
         except Exception as e:
             print(f"❌ Failed to delete store: {e}")
             return False
     
-    def interactive_mode(self, store_name: str):
+    def interactive_mode(self, store_name: str) -> bool:
         """Start interactive Q&A session."""
         print(f"\n🎯 Interactive mode with store: {store_name}")
         print("Type 'quit' to exit, 'help' for commands")
         print("="*50)
         
+        # Piped or pasted input doesn't need a prompt per line; read it in bulk
+        # and overlap answering one query with generating the next
+        if not sys.stdin.isatty():
+            self._interactive_piped(store_name)
+            return True
+        
+        # Commands and searches report their own errors, so only interrupts
+        # and end of input need handling here
         while True:
             try:
                 query = input("\n💬 Query: ").strip()
@@ -188,12 +303,93 @@ class RAGSystemCLI:
                 if not query:
                     continue
                 
-                if query.lower() in ['quit', 'exit', 'q']:
-                    print("👋 Goodbye!")
+                next_store, handled = self._handle_interactive_command(query, store_name)
+                if next_store is None:
                     break
+                store_name = next_store
+                
+                if not handled:
+                    # Regular search query
+                    self.search(query, store_name)
+                
+            except (KeyboardInterrupt, EOFError):
+                print("\n👋 Goodbye!")
+                break
+        
+        # Individual queries report their own failures; ending the session is success
+        return True
+    
+    def _interactive_piped(self, store_name: str):
+        """Run interactive mode over non-TTY stdin, prefetching the next answer."""
+        pending = deque()
+        
+        def render_oldest():
+            query, future = pending.popleft()
+            print(f"\n💬 Query: {query}")
+            try:
+                self._print_search_response(future.result())
+            except Exception as e:
+                print(f"❌ Search failed: {e}")
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for line in sys.stdin:
+                query = line.strip()
+                if not query:
+                    continue
+                
+                if not self._is_interactive_command(query):
+                    pending.append((query, executor.submit(
+                        self.search_manager.search_and_generate,
+                        query=query,
+                        store_name=self._resolve_store(store_name) or store_name
+                    )))
+                    # Keep one query generating ahead of the one being printed
+                    while len(pending) > 1:
+                        render_oldest()
+                    continue
                 
-                if query.lower() == 'help':
-                    print("""
+                # Commands run in order, after any queued answers
+                while pending:
+                    render_oldest()
+                try:
+                    next_store, _ = self._handle_interactive_command(query, store_name)
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+                    continue
+                if next_store is None:
+                    break
+                store_name = next_store
+            
+            while pending:
+                render_oldest()
+    
+    def _is_interactive_command(self, query: str) -> bool:
+        """Check whether an interactive-mode input is a command rather than a search."""
+        lowered = query.lower()
+        return (
+            lowered in _QUIT_COMMANDS
+            or lowered in _SIMPLE_COMMANDS
+            or lowered.startswith(_PREFIX_COMMANDS)
+        )
+    
+    def _handle_interactive_command(self, query: str, store_name: str) -> Tuple[Optional[str], bool]:
+        """
+        Handle an interactive-mode command.
+        
+        Args:
+            query: Stripped user input
+            store_name: Store currently in use
+            
+        Returns:
+            Tuple of (store to use next, or None to quit; whether input was a command)
+        """
+        lowered = query.lower()
+        if lowered in _QUIT_COMMANDS:
+            print("👋 Goodbye!")
+            return None, True
+        
+        if lowered == 'help':
+            print("""
 Available commands:
   • Any question or query - Get AI-powered answer with citations
   • 'summarize' - Generate document summary
@@ -203,36 +399,47 @@ Available commands:
   • 'help' - Show this help
   • 'quit' - Exit interactive mode
 """)
-                    continue
-                
-                if query.lower() == 'stores':
-                    self.list_stores()
-                    continue
-                
-                if query.lower().startswith('switch '):
-                    new_store = query[7:].strip()
-                    if new_store:
-                        store_name = new_store
-                        print(f"🔄 Switched to store: {store_name}")
-                    continue
-                
-                if query.lower().startswith('summarize'):
-                    parts = query.split(' ', 1)
-                    topic = parts[1] if len(parts) > 1 else None
-                    self.summarize(store_name, topic)
-                    continue
-                
-                # Regular search query
-                self.search(query, store_name)
-                
-            except KeyboardInterrupt:
-                print("\n👋 Goodbye!")
-                break
-            except Exception as e:
-                print(f"❌ Error: {e}")
+            return store_name, True
+        
+        if lowered == 'stores':
+            self.list_stores()
+            return store_name, True
+        
+        if lowered.startswith('switch '):
+            new_store = query[7:].strip()
+            if new_store:
+                store_name = new_store
+                print(f"🔄 Switched to store: {store_name}")
+            return store_name, True
+        
+        if lowered.startswith('summarize'):
+            parts = query.split(' ', 1)
+            topic = parts[1] if len(parts) > 1 else None
+            self.summarize(store_name, topic)
+            return store_name, True
+        
+        return store_name, False
 
-def main():
-    """Main CLI entry point."""
+# command -> (minimum args, maximum args or None for no limit, usage message)
+COMMANDS = {
+    'create-store': (1, 1, "❌ Store name required"),
+    'list-stores': (0, 0, ""),
+    'delete-store': (1, 1, "❌ Store name required"),
+    'upload': (2, 2, "❌ Usage: upload <file_path> <store_name>"),
+    'upload-dir': (2, 2, "❌ Usage: upload-dir <directory_path> <store_name>"),
+    'search': (2, 2, "❌ Usage: search \"<query>\" <store_name>"),
+    'ask': (2, None, "❌ Usage: ask \"<question>\" [\"<question>\" ...] <store_name>"),
+    'summarize': (1, 2, "❌ Store name required"),
+    'interactive': (1, 1, "❌ Store name required for interactive mode"),
+}
+
+def main() -> int:
+    """
+    Main CLI entry point.
+    
+    Returns:
+        Process exit code (0 on success, 1 on failure, 2 on usage errors)
+    """
     parser = argparse.ArgumentParser(
         description="Google File Search RAG System",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -247,12 +454,18 @@ Examples:
   # Upload a directory
   python main.py upload-dir ./documents my-docs
 
+  # Upload a directory with up to 16 parallel uploads
+  python main.py upload-dir ./documents my-docs --concurrency 16
+
   # Search for information
   python main.py search "What is machine learning?" my-docs
 
   # Ask a direct question
   python main.py ask "How does this system work?" my-docs
 
+  # Ask several questions in one request
+  python main.py ask "What is X?" "What is Y?" my-docs
+
   # Generate summary
   python main.py summarize my-docs
 
@@ -269,81 +482,72 @@ Examples:
     
     parser.add_argument('command', help='Command to execute')
     parser.add_argument('args', nargs='*', help='Command arguments')
-    parser.add_argument('--model', default=settings.default_model, help='Model to use')
+    parser.add_argument('--model', default=None, help='Model to use (default: DEFAULT_MODEL)')
     parser.add_argument('--format', action='store_true', help='Format output nicely')
+    parser.add_argument('--stream', action='store_true', help='Print search answers as they are generated')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Maximum parallel uploads for upload-dir (default: MAX_UPLOAD_WORKERS)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Reuse answers to repeated queries, cached on disk in ~/.cache/rag/ (off by default)')
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help='Seconds a cached answer stays valid with --cache (default: 3600)')
+    parser.add_argument('--context-cache-ttl', type=int, default=None,
+                        help='Cache the prompt prefix with Gemini context caching for this many seconds')
+    parser.add_argument('--semantic-cache', type=float, nargs='?', const=0.92, default=None, metavar='THRESHOLD',
+                        help='Reuse answers to similar queries above this cosine similarity (default: 0.92)')
     
     args = parser.parse_args()
     
+    if args.command not in COMMANDS:
+        print(f"❌ Unknown command: {args.command}")
+        parser.print_help()
+        return 2
+    
+    # Validate arguments before paying for client construction
+    min_args, max_args, usage = COMMANDS[args.command]
+    if len(args.args) < min_args:
+        print(usage)
+        return 2
+    command_args = args.args if max_args is None else args.args[:max_args]
+    
     try:
-        cli = RAGSystemCLI()
+        cli = RAGSystemCLI(
+            use_cache=args.cache,
+            cache_ttl=args.cache_ttl,
+            context_cache_ttl=args.context_cache_ttl,
+            semantic_threshold=args.semantic_cache
+        )
         
         # Set model if specified
-        if args.model != settings.default_model:
+        if args.model and args.model != cli.search_manager.model_name:
             cli.search_manager.set_model(args.model)
         
-        # Execute commands
-        if args.command == 'create-store':
-            if not args.args:
-                print("❌ Store name required")
-                return
-            cli.create_store(args.args[0])
-        
-        elif args.command == 'list-stores':
-            cli.list_stores()
-        
-        elif args.command == 'delete-store':
-            if not args.args:
-                print("❌ Store name required")
-                return
-            cli.delete_store(args.args[0])
-        
-        elif args.command == 'upload':
-            if len(args.args) < 2:
-                print("❌ Usage: upload <file_path> <store_name>")
-                return
-            cli.upload_file(args.args[0], args.args[1])
-        
-        elif args.command == 'upload-dir':
-            if len(args.args) < 2:
-                print("❌ Usage: upload-dir <directory_path> <store_name>")
-                return
-            cli.upload_directory(args.args[0], args.args[1])
+        # Every handler returns True on success and False on failure
+        handlers = {
+            'create-store': cli.create_store,
+            'list-stores': cli.list_stores,
+            'delete-store': cli.delete_store,
+            'upload': cli.upload_file,
+            'upload-dir': lambda path, store: cli.upload_directory(path, store, concurrency=args.concurrency),
+            'search': lambda query, store: cli.search(query, store, args.format, stream=args.stream),
+            'ask': lambda *ask_args: (
+                cli.ask_questions(list(ask_args[:-1]), ask_args[-1]) if len(ask_args) > 2
+                else cli.ask_question(*ask_args)
+            ),
+            'summarize': cli.summarize,
+            'interactive': cli.interactive_mode,
+        }
         
-        elif args.command == 'search':
-            if len(args.args) < 2:
-                print("❌ Usage: search \"<query>\" <store_name>")
-                return
-            cli.search(args.args[0], args.args[1], args.format)
-        
-        elif args.command == 'ask':
-            if len(args.args) < 2:
-                print("❌ Usage: ask \"<question>\" <store_name>")
-                return
-            cli.ask_question(args.args[0], args.args[1])
-        
-        elif args.command == 'summarize':
-            if not args.args:
-                print("❌ Store name required")
-                return
-            focus = args.args[1] if len(args.args) > 1 else None
-            cli.summarize(args.args[0], focus)
-        
-        elif args.command == 'interactive':
-            if not args.args:
-                print("❌ Store name required for interactive mode")
-                return
-            cli.interactive_mode(args.args[0])
-        
-        else:
-            print(f"❌ Unknown command: {args.command}")
-            parser.print_help()
+        return 0 if handlers[args.command](*command_args) else 1
     
     except KeyboardInterrupt:
         print("\n👋 Interrupted by user")
+        return 130
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,13 +1,30 @@
 """
 Document processor for handling file uploads and preprocessing.
 """
+import hashlib
 import os
+import stat
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 import mimetypes
+from functools import lru_cache
 
-from src.file_search_client import FileSearchClient
-from config.settings import settings
+from src.file_search_client import CONTENT_HASH_KEY, FileSearchClient, UploadTimeoutError
+from config.settings import get_settings
+
+@lru_cache(maxsize=256)
+def _mime_for_suffix(suffix: str) -> Optional[str]:
+    """Guess a MIME type from a lowercased file suffix (the result only depends on the suffix)."""
+    return mimetypes.types_map.get(suffix) or mimetypes.guess_type('x' + suffix)[0]
+
+def _sha256_file(file_path: str) -> str:
+    """Hash a file's contents in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 class DocumentProcessor:
     """Handles document preprocessing, validation, and upload operations."""
@@ -24,6 +41,9 @@ class DocumentProcessor:
         '.json': 'application/json',
         '.xml': 'application/xml'
     }
+    # Precomputed for per-file suffix checks and validation error messages
+    SUPPORTED_SUFFIXES = frozenset(SUPPORTED_FORMATS)
+    SUPPORTED_SUFFIXES_STR = ", ".join(sorted(SUPPORTED_FORMATS))
     
     def __init__(self, client: FileSearchClient):
         """Initialize with a FileSearchClient instance."""
@@ -39,48 +59,79 @@ class DocumentProcessor:
         Returns:
             Tuple of (is_valid, error_message)
         """
+        is_valid, error_msg, _ = self._validate(file_path)
+        return is_valid, error_msg
+    
+    def _validate(self, file_path: str) -> Tuple[bool, str, Optional[os.stat_result]]:
+        """
+        Validate a file, also returning its stat result so uploads need not re-stat it.
+        
+        Returns:
+            Tuple of (is_valid, error_message, stat result or None)
+        """
         try:
             path = Path(file_path)
             
-            # Check if file exists
-            if not path.exists():
-                return False, f"File not found: {file_path}"
-            
-            # Check file extension
-            if path.suffix.lower() not in self.SUPPORTED_FORMATS:
-                return False, f"Unsupported file format: {path.suffix}. Supported: {list(self.SUPPORTED_FORMATS.keys())}"
-            
-            # Check file size
-            size_mb = path.stat().st_size / (1024 * 1024)
-            if size_mb > settings.max_file_size_mb:
-                return False, f"File too large: {size_mb:.1f}MB (max {settings.max_file_size_mb}MB)"
-            
-            # Check if file is readable
+            # Check if file exists; the same stat result drives the remaining checks.
+            # lstat so symlinks, like FIFOs and devices, are rejected as non-regular
             try:
-                with open(path, 'rb'):
-                    pass
+                file_stat = os.lstat(path)
+            except FileNotFoundError:
+                return False, f"File not found: {file_path}", None
             except PermissionError:
-                return False, f"Cannot read file: {file_path} (permission denied)"
+                return False, f"Cannot read file: {file_path} (permission denied)", None
             
-            return True, ""
+            is_valid, error_msg = self._validate_from_stat(path, file_stat)
+            return is_valid, error_msg, file_stat
             
         except Exception as e:
-            return False, f"Error validating file: {e}"
+            return False, f"Error validating file: {e}", None
+    
+    def _validate_from_stat(self, path: Path, file_stat: os.stat_result) -> Tuple[bool, str]:
+        """Validate a file using an existing stat result instead of re-statting it."""
+        if not stat.S_ISREG(file_stat.st_mode):
+            return False, f"Not a regular file: {path}"
+        
+        # Check file extension
+        if path.suffix.lower() not in self.SUPPORTED_SUFFIXES:
+            return False, f"Unsupported file format: {path.suffix}. Supported: {self.SUPPORTED_SUFFIXES_STR}"
+        
+        # Check file size
+        size_mb = file_stat.st_size / (1024 * 1024)
+        max_file_size_mb = get_settings().max_file_size_mb
+        if size_mb > max_file_size_mb:
+            return False, f"File too large: {size_mb:.1f}MB (max {max_file_size_mb}MB)"
+        
+        # Check if file is readable without opening it
+        if not os.access(path, os.R_OK):
+            return False, f"Cannot read file: {path} (permission denied)"
+        
+        return True, ""
     
     def batch_validate_files(self, file_paths: List[str]) -> Dict[str, Tuple[bool, str]]:
         """
         Validate multiple files at once.
         
+        Validation is stat-bound, so files are checked concurrently to overlap
+        filesystem latency (noticeable on network filesystems).
+        
         Args:
             file_paths: List of file paths to validate
             
         Returns:
             Dictionary mapping file paths to validation results
         """
-        results = {}
-        for file_path in file_paths:
-            results[file_path] = self.validate_file(file_path)
-        return results
+        return {
+            file_path: (is_valid, error_msg)
+            for file_path, (is_valid, error_msg, _) in self._batch_validate(file_paths).items()
+        }
+    
+    def _batch_validate(self, file_paths: List[str]) -> Dict[str, Tuple[bool, str, Optional[os.stat_result]]]:
+        """Validate files concurrently, keeping each file's stat result."""
+        if not file_paths:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(32, len(file_paths))) as executor:
+            return dict(zip(file_paths, executor.map(self._validate, file_paths)))
     
     def get_chunking_config(
         self,
@@ -97,6 +148,7 @@ class DocumentProcessor:
         Returns:
             Chunking config dictionary or None if using defaults
         """
+        settings = get_settings()
         tokens = max_tokens_per_chunk or settings.max_tokens_per_chunk
         overlap = max_overlap_tokens or settings.max_overlap_tokens
         
@@ -112,7 +164,8 @@ class DocumentProcessor:
         file_path: str,
         store_name: str,
         display_name: Optional[str] = None,
-        use_custom_chunking: bool = False
+        use_custom_chunking: bool = False,
+        custom_metadata: Optional[List[Dict[str, Any]]] = None
     ) -> str:
         """
         Upload a document with preprocessing.
@@ -122,12 +175,13 @@ class DocumentProcessor:
             store_name: Target File Search store (resource ID)
             display_name: Optional display name
             use_custom_chunking: Whether to use custom chunking config
+            custom_metadata: Optional custom metadata entries ({'key': ..., 'string_value': ...})
             
         Returns:
             Operation name
         """
         # Validate file first
-        is_valid, error_msg = self.validate_file(file_path)
+        is_valid, error_msg, file_stat = self._validate(file_path)
         if not is_valid:
             raise ValueError(error_msg)
         
@@ -139,7 +193,9 @@ class DocumentProcessor:
             file_path=file_path,
             store_name=store_name,
             display_name=display_name,
-            chunking_config=chunking_config
+            chunking_config=chunking_config,
+            file_stat=file_stat,
+            custom_metadata=custom_metadata
         )
     
     def upload_directory(
@@ -147,70 +203,268 @@ class DocumentProcessor:
         directory_path: str,
         store_name: str,
         recursive: bool = True,
-        use_custom_chunking: bool = False
+        use_custom_chunking: bool = False,
+        max_workers: Optional[int] = None,
+        batch_size: int = 32,
+        skip_unchanged: bool = False
     ) -> List[str]:
         """
         Upload all supported files in a directory.
         
+        Uploads are started concurrently, and their operations are polled
+        together in batches while later uploads keep starting. Each file is
+        stat'd exactly once, during validation; the upload reuses that result.
+        
         Args:
             directory_path: Path to the directory
             store_name: Target File Search store (resource ID)
             recursive: Whether to search subdirectories
             use_custom_chunking: Whether to use custom chunking config
+            max_workers: Maximum concurrent uploads (default from settings)
+            batch_size: Number of files whose operations are polled together
+            skip_unchanged: Skip files whose content hash matches the document
+                already in the store under the same display name; a changed
+                file replaces that document once its upload has finished
             
         Returns:
             List of operation names
         """
         directory = Path(directory_path)
+        valid_files = self._find_valid_files(directory, recursive)
+        if not valid_files:
+            return []
+        
+        chunking_config = self.get_chunking_config() if use_custom_chunking else None
+        
+        # Documents already in the store, by display name
+        existing_documents: Dict[str, List[Dict[str, Any]]] = {}
+        if skip_unchanged:
+            for file_info in self.client.list_files_in_store(store_name, refresh=True):
+                existing_documents.setdefault(file_info['display_name'], []).append(file_info)
+        # file path -> documents its upload replaces, deleted once the upload finishes
+        replaced: Dict[str, List[str]] = {}
+        
+        def upload_one(file_path: str, file_stat: os.stat_result) -> Optional[Any]:
+            # Use relative path as display name
+            display_name = os.path.relpath(file_path, directory_path)
+            custom_metadata = None
+            if skip_unchanged:
+                content_hash = _sha256_file(file_path)
+                previous = existing_documents.get(display_name, ())
+                if any(info['custom_metadata'].get(CONTENT_HASH_KEY) == content_hash for info in previous):
+                    return None
+                if previous:
+                    replaced[file_path] = [info['name'] for info in previous]
+                custom_metadata = [{'key': CONTENT_HASH_KEY, 'string_value': content_hash}]
+            return self.client.start_upload(
+                file_path=file_path,
+                store_name=store_name,
+                display_name=display_name,
+                chunking_config=chunking_config,
+                file_stat=file_stat,
+                custom_metadata=custom_metadata
+            )
+        
+        # Upload valid files concurrently; each upload is network-bound
+        operation_names = []
+        skipped = 0
+        max_workers = max(1, min(max_workers or get_settings().max_upload_workers, len(valid_files)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Queue every upload up front so the workers keep starting uploads
+            # while earlier batches are being polled
+            futures = {
+                executor.submit(upload_one, file_path, file_stat): file_path
+                for file_path, file_stat in valid_files.items()
+            }
+            batch_files, operations = [], []
+            for future in as_completed(futures):
+                try:
+                    operation = future.result()
+                except Exception as e:
+                    print(f"❌ Failed to upload {futures[future]}: {e}")
+                    continue
+                if operation is None:
+                    skipped += 1
+                    continue
+                batch_files.append(futures[future])
+                operations.append(operation)
+                
+                # Poll each full batch in one loop instead of one loop per file
+                if len(operations) >= batch_size:
+                    operation_names.extend(self._finish_batch(batch_files, operations, replaced))
+                    batch_files, operations = [], []
+            
+            operation_names.extend(self._finish_batch(batch_files, operations, replaced))
+        
+        if skipped:
+            print(f"⏭️  Skipped {skipped} unchanged files")
+        print(f"✅ Successfully uploaded {len(operation_names)} files")
+        return operation_names
+    
+    def _finish_batch(
+        self,
+        file_paths: List[str],
+        operations: List[Any],
+        replaced: Dict[str, List[str]]
+    ) -> List[str]:
+        """
+        Wait for a batch of uploads, then delete the documents they replace.
+        
+        A replaced document is only deleted after its new version finished
+        processing, so a failed upload never leaves the store without the file.
+        
+        Args:
+            file_paths: Uploaded file for each operation, in the same order
+            operations: Operations returned by start_upload
+            replaced: Documents to delete for each re-uploaded file
+            
+        Returns:
+            Names of the operations that finished processing
+        """
+        started = {operation.name: file_path for file_path, operation in zip(file_paths, operations)}
+        finished = self._wait_for_batch(file_paths, operations)
+        for operation_name in finished:
+            file_path = started.get(operation_name)
+            for document_name in replaced.get(file_path, ()):
+                try:
+                    self.client.delete_document(document_name)
+                except Exception:
+                    # delete_document has already reported it; the store keeps both copies
+                    print(f"⚠️  Previous version of {file_path} is still in the store")
+        return finished
+    
+    def _wait_for_batch(self, file_paths: List[str], operations: List[Any]) -> List[str]:
+        """
+        Wait for a batch of upload operations, reporting failures per file.
+        
+        Args:
+            file_paths: Uploaded file for each operation, in the same order
+            operations: Operations returned by start_upload
+            
+        Returns:
+            Names of the operations that finished processing
+        """
+        if not operations:
+            return []
+        try:
+            return [operation.name for operation in self.client.wait_for_operations(operations)]
+        except UploadTimeoutError as e:
+            pending = set(e.pending)
+            finished = []
+            for file_path, operation in zip(file_paths, e.operations):
+                if operation.name in pending:
+                    print(f"❌ Upload of {file_path} still processing after the timeout")
+                else:
+                    finished.append(operation.name)
+            return finished
+        except Exception as e:
+            # Polling failed, so the outcome of every upload in the batch is unknown
+            print(f"❌ Could not confirm {len(operations)} upload(s) ({', '.join(file_paths)}): {e}")
+            return []
+    
+    async def a_upload_directory(
+        self,
+        directory_path: str,
+        store_name: str,
+        recursive: bool = True,
+        use_custom_chunking: bool = False,
+        max_concurrency: Optional[int] = None
+    ) -> List[str]:
+        """
+        Async variant of upload_directory that runs every upload as a coroutine.
+        
+        Args:
+            directory_path: Path to the directory
+            store_name: Target File Search store (resource ID)
+            recursive: Whether to search subdirectories
+            use_custom_chunking: Whether to use custom chunking config
+            max_concurrency: Maximum uploads in flight (default from settings)
+            
+        Returns:
+            List of operation names
+        """
+        directory = Path(directory_path)
+        valid_files = self._find_valid_files(directory, recursive)
+        if not valid_files:
+            return []
+        
+        results = await self.client.a_upload_documents(
+            list(valid_files),
+            store_name,
+            # Use relative path as display name
+            display_names=[os.path.relpath(file_path, directory_path) for file_path in valid_files],
+            chunking_config=self.get_chunking_config() if use_custom_chunking else None,
+            max_concurrency=max_concurrency or get_settings().max_upload_workers,
+            # Reuse the stat results from validation instead of statting every file again
+            file_stats=list(valid_files.values())
+        )
+        operation_names = [name for name in results if name is not None]
+        
+        print(f"✅ Successfully uploaded {len(operation_names)} files")
+        return operation_names
+    
+    def _find_valid_files(self, directory: Path, recursive: bool) -> Dict[str, os.stat_result]:
+        """
+        Find and validate the supported files in a directory, reporting invalid ones.
+        
+        Args:
+            directory: Directory to search
+            recursive: Whether to search subdirectories
+            
+        Returns:
+            Stat results of the files that passed validation, keyed by path
+        """
         if not directory.exists() or not directory.is_dir():
-            raise ValueError(f"Directory not found or not a directory: {directory_path}")
+            raise ValueError(f"Directory not found or not a directory: {directory}")
         
         # Find all supported files
-        files_to_upload = []
-        pattern = "**/*" if recursive else "*"
-        
-        for file_path in directory.glob(pattern):
-            if file_path.is_file() and file_path.suffix.lower() in self.SUPPORTED_FORMATS:
-                files_to_upload.append(file_path)
+        files_to_upload = list(self._iter_supported_files(str(directory), recursive))
         
         if not files_to_upload:
-            print(f"⚠️  No supported files found in {directory_path}")
-            return []
+            print(f"⚠️  No supported files found in {directory}")
+            return {}
         
         # Validate all files first
         print(f"🔍 Found {len(files_to_upload)} files to upload")
-        validation_results = self.batch_validate_files([str(f) for f in files_to_upload])
+        validation_results = self._batch_validate(files_to_upload)
         
-        valid_files = [f for f, (valid, _) in validation_results.items() if valid]
-        invalid_files = [f for f, (valid, msg) in validation_results.items() if not valid]
+        valid_files = {f: file_stat for f, (valid, _, file_stat) in validation_results.items() if valid}
+        invalid_files = [f for f, (valid, _, _) in validation_results.items() if not valid]
         
         if invalid_files:
             print(f"⚠️  Skipping {len(invalid_files)} invalid files:")
             for file_path in invalid_files:
-                _, error_msg = validation_results[file_path]
+                _, error_msg, _ = validation_results[file_path]
                 print(f"  - {file_path}: {error_msg}")
         
-        # Upload valid files
-        operation_names = []
-        for file_path in valid_files:
-            try:
-                path = Path(file_path)
-                # Use relative path as display name
-                relative_path = path.relative_to(directory)
-                
-                operation_name = self.upload_document(
-                    file_path=file_path,
-                    store_name=store_name,
-                    display_name=str(relative_path),
-                    use_custom_chunking=use_custom_chunking
-                )
-                operation_names.append(operation_name)
-                
-            except Exception as e:
-                print(f"❌ Failed to upload {file_path}: {e}")
+        return valid_files
+    
+    def _iter_supported_files(self, directory_path: str, recursive: bool = True) -> Iterator[str]:
+        """
+        Yield paths of supported files under a directory.
         
-        print(f"✅ Successfully uploaded {len(operation_names)} files")
-        return operation_names
+        Uses os.scandir so file/directory checks come from the directory
+        listing itself rather than a stat per entry.
+        
+        Args:
+            directory_path: Path to the directory
+            recursive: Whether to descend into subdirectories
+            
+        Yields:
+            File paths with a supported suffix
+        """
+        stack = [directory_path]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot > 0 and name[dot:].lower() in self.SUPPORTED_SUFFIXES:
+                            yield entry.path
     
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """
@@ -224,21 +478,21 @@ class DocumentProcessor:
         """
         path = Path(file_path)
         
-        if not path.exists():
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
-        
-        stat = path.stat()
-        mime_type, _ = mimetypes.guess_type(str(path))
+        mime_type = _mime_for_suffix(path.suffix.lower())
         
         return {
             'path': str(path.absolute()),
             'name': path.name,
             'stem': path.stem,
             'suffix': path.suffix,
-            'size_bytes': stat.st_size,
-            'size_mb': stat.st_size / (1024 * 1024),
+            'size_bytes': file_stat.st_size,
+            'size_mb': file_stat.st_size / (1024 * 1024),
             'mime_type': mime_type,
-            'is_supported': path.suffix.lower() in self.SUPPORTED_FORMATS,
-            'modified_time': stat.st_mtime,
-            'created_time': stat.st_ctime
+            'is_supported': path.suffix.lower() in self.SUPPORTED_SUFFIXES,
+            'modified_time': file_stat.st_mtime,
+            'created_time': file_stat.st_ctime
         }
\ No newline at end of file
@@ -3,20 +3,81 @@ Core Google File Search API client wrapper using the official FileSearchStore AP
 """
 from google import genai
 from google.genai import types
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+import asyncio
 import os
+import random
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlparse
 
-from config.settings import settings
+from config.settings import get_settings
+
+# How long a store's file listing is reused before it is fetched again
+FILES_CACHE_TTL_SECONDS = 60
+
+# A store's file information dictionaries, shared between callers
+FileListing = Tuple[Dict[str, Any], ...]
+
+# Store fields that together change whenever a store's documents change
+STORE_FINGERPRINT_FIELDS = (
+    'update_time', 'active_documents_count', 'pending_documents_count',
+    'failed_documents_count', 'size_bytes'
+)
+
+# Custom metadata key holding a document's SHA-256, used to skip unchanged re-uploads
+CONTENT_HASH_KEY = 'content_hash'
+
+# Default cap on concurrent requests issued by the async helpers
+ASYNC_MAX_CONCURRENCY = 16
+
+# Upload polling: exponential backoff factor and overall limit
+POLL_BACKOFF = 1.7
+UPLOAD_TIMEOUT_SECONDS = 300
+
+class UploadTimeoutError(TimeoutError):
+    """Raised when upload operations are still processing after the timeout."""
+    
+    def __init__(self, operations: List[Any], pending: List[str], timeout: float):
+        """
+        Args:
+            operations: Latest state of every polled operation, in the original order
+            pending: Names of the operations that had not finished
+            timeout: Seconds waited before giving up
+        """
+        super().__init__(
+            f"{len(pending)} upload(s) still processing after {timeout:.0f}s: {', '.join(pending)}"
+        )
+        self.operations = operations
+        self.pending = pending
+
+def _jittered(delay: float) -> float:
+    """Spread a polling delay by ±20% so concurrent pollers drift apart."""
+    return delay * random.uniform(0.8, 1.2)
 
 class FileSearchClient:
     """Wrapper class for Google AI File Search operations."""
     
     def __init__(self, api_key: Optional[str] = None):
         """Initialize the client with API key."""
-        self.api_key = api_key or settings.api_key
+        self.api_key = api_key or get_settings().api_key
         self.client = genai.Client(api_key=self.api_key)
+        # Per-process cache of store listings, kept in sync by create/delete
+        self._stores_cache: Optional[List[Dict[str, Any]]] = None
+        # display name -> resource name, rebuilt whenever the store cache changes
+        self._stores_index: Dict[str, str] = {}
+        self._stores_lock = threading.Lock()
+        # store name -> (expiry, file listing) for list_files_in_store
+        self._files_cache: Dict[str, Tuple[float, FileListing]] = {}
+        # store name -> (expiry, fingerprint) for get_store_fingerprint
+        self._fingerprints: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._files_lock = threading.Lock()
+        # Bumped whenever a store or file listing this client returns changes
+        self._version = 0
+        self._version_lock = threading.Lock()
     
     def create_store(self, store_name: str) -> str:
         """
@@ -34,6 +95,12 @@ class FileSearchClient:
             )
             print(f"✅ Created File Search store: {store_name}")
             print(f"   Store ID: {file_search_store.name}")
+            with self._stores_lock:
+                if self._stores_cache is not None:
+                    store_info = self._store_info(file_search_store)
+                    self._stores_cache.append(store_info)
+                    self._stores_index.setdefault(store_info['display_name'], store_info['name'])
+            self._bump_version()
             return file_search_store.name
         except Exception as e:
             print(f"❌ Error creating store '{store_name}': {e}")
@@ -43,22 +110,41 @@ class FileSearchClient:
         """
         List all File Search stores.
         
+        Results are cached per client and updated by create_store/delete_store;
+        call refresh_stores() to pick up changes made elsewhere.
+        
+        Returns:
+            List of store information dictionaries
+        """
+        with self._stores_lock:
+            if self._stores_cache is not None:
+                return list(self._stores_cache)
+        return self.refresh_stores()
+    
+    def refresh_stores(self) -> List[Dict[str, Any]]:
+        """
+        Re-fetch the store list from the API and replace the cached copy.
+        
         Returns:
             List of store information dictionaries
         """
         try:
-            stores = []
-            for store in self.client.file_search_stores.list():
-                stores.append({
-                    'name': store.name,
-                    'display_name': getattr(store, 'display_name', store.name),
-                    'create_time': getattr(store, 'create_time', 'N/A')
-                })
-            return stores
+            stores = [self._store_info(store) for store in self.client.file_search_stores.list()]
+            with self._stores_lock:
+                self._set_stores(stores)
+            return list(stores)
         except Exception as e:
             print(f"❌ Error listing stores: {e}")
             raise
     
+    def _store_info(self, store: Any) -> Dict[str, Any]:
+        """Convert an API store object into a store information dictionary."""
+        return {
+            'name': store.name,
+            'display_name': getattr(store, 'display_name', store.name),
+            'create_time': getattr(store, 'create_time', 'N/A')
+        }
+    
     def get_store(self, store_name: str) -> Optional[Any]:
         """
         Get a specific File Search store by name.
@@ -75,6 +161,35 @@ class FileSearchClient:
             print(f"⚠️  Could not get store '{store_name}': {e}")
             return None
     
+    def get_store_fingerprint(self, store_name: str) -> Optional[str]:
+        """
+        Get a string that changes whenever a store's documents change.
+        
+        Suitable for keying persistent caches of answers grounded on the store.
+        The value (or a failed fetch) is reused for FILES_CACHE_TTL_SECONDS, and
+        dropped early when this client uploads to or deletes the store.
+        
+        Args:
+            store_name: Full resource name of the store
+            
+        Returns:
+            Fingerprint string, or None if the store could not be fetched
+        """
+        now = time.monotonic()
+        with self._files_lock:
+            cached = self._fingerprints.get(store_name)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        store = self.get_store(store_name)
+        # A failed fetch is remembered too, so callers don't retry it on every request
+        fingerprint = None if store is None else "|".join(
+            str(getattr(store, field, None)) for field in STORE_FINGERPRINT_FIELDS
+        )
+        with self._files_lock:
+            self._fingerprints[store_name] = (now + FILES_CACHE_TTL_SECONDS, fingerprint)
+        return fingerprint
+    
     def delete_store(self, store_name: str, force: bool = True) -> bool:
         """
         Delete a File Search store.
@@ -92,17 +207,164 @@ class FileSearchClient:
                 config={'force': force}
             )
             print(f"✅ Deleted File Search store: {store_name}")
+            self._invalidate_files(store_name)
+            with self._stores_lock:
+                if self._stores_cache is not None:
+                    self._set_stores([
+                        store for store in self._stores_cache if store['name'] != store_name
+                    ])
             return True
         except Exception as e:
             print(f"❌ Error deleting store '{store_name}': {e}")
             raise
     
+    def delete_document(self, document_name: str, force: bool = True) -> bool:
+        """
+        Delete a document from its File Search store.
+        
+        Args:
+            document_name: Full resource name of the document
+                (fileSearchStores/<store>/documents/<document>)
+            force: Whether to also delete the document's chunks
+        
+        Returns:
+            True if successful
+        """
+        try:
+            self.client.file_search_stores.documents.delete(
+                name=document_name,
+                config={'force': force}
+            )
+            self._invalidate_files(document_name.rsplit('/documents/', 1)[0])
+            return True
+        except Exception as e:
+            print(f"❌ Error deleting document '{document_name}': {e}")
+            raise
+    
+    def start_upload(
+        self,
+        file_path: str,
+        store_name: str,
+        display_name: Optional[str] = None,
+        chunking_config: Optional[Dict[str, Any]] = None,
+        file_stat: Optional[os.stat_result] = None,
+        custom_metadata: Optional[List[Dict[str, Any]]] = None
+    ) -> Any:
+        """
+        Start uploading a document to a File Search store without waiting for processing.
+        
+        Args:
+            file_path: Path to the file to upload
+            store_name: Full resource name of the target store
+            display_name: Optional display name for the file
+            chunking_config: Optional chunking configuration
+            file_stat: Stat result from earlier validation, to avoid re-statting
+            custom_metadata: Optional custom metadata entries ({'key': ..., 'string_value': ...})
+            
+        Returns:
+            Long-running upload operation
+        """
+        file_path_obj, upload_config = self._prepare_upload(file_path, display_name, chunking_config, file_stat)
+        if custom_metadata:
+            upload_config['custom_metadata'] = custom_metadata
+        
+        # Upload directly to file search store
+        operation = self.client.file_search_stores.upload_to_file_search_store(
+            file=str(file_path_obj),
+            file_search_store_name=store_name,
+            config=upload_config
+        )
+        self._invalidate_files(store_name)
+        return operation
+    
+    def _prepare_upload(
+        self,
+        file_path: str,
+        display_name: Optional[str],
+        chunking_config: Optional[Dict[str, Any]],
+        file_stat: Optional[os.stat_result] = None
+    ) -> Tuple[Path, Dict[str, Any]]:
+        """Validate a file for upload and build its upload config."""
+        file_path_obj = Path(file_path)
+        if file_stat is None:
+            try:
+                file_stat = os.stat(file_path_obj)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"File not found: {file_path}")
+        
+        # Check file size
+        file_size_mb = file_stat.st_size / (1024 * 1024)
+        max_file_size_mb = get_settings().max_file_size_mb
+        if file_size_mb > max_file_size_mb:
+            raise ValueError(f"File size ({file_size_mb:.1f}MB) exceeds limit ({max_file_size_mb}MB)")
+        
+        print(f"🔄 Uploading {file_path_obj.name} ({file_size_mb:.1f}MB)...")
+        
+        # Prepare config
+        upload_config = {
+            'display_name': display_name or file_path_obj.name
+        }
+        
+        # Add chunking config if provided
+        if chunking_config:
+            upload_config['chunking_config'] = chunking_config
+        
+        return file_path_obj, upload_config
+    
+    def wait_for_operations(
+        self,
+        operations: List[Any],
+        initial_interval: float = 0.1,
+        max_interval: float = 2.0,
+        timeout: float = UPLOAD_TIMEOUT_SECONDS
+    ) -> List[Any]:
+        """
+        Wait for several upload operations using one shared polling loop.
+        
+        Polling starts fast so small files return quickly, then backs off
+        exponentially (with jitter, so concurrent waiters don't poll in step).
+        
+        Args:
+            operations: Operations returned by start_upload
+            initial_interval: Seconds to sleep before the first re-poll
+            max_interval: Upper bound on the sleep between polls
+            timeout: Maximum number of seconds to wait
+            
+        Returns:
+            Completed operations, in the same order
+            
+        Raises:
+            UploadTimeoutError: If some operations are unfinished at the timeout;
+                it lists their names and carries every operation's latest state
+        """
+        operations = list(operations)
+        deadline = time.monotonic() + timeout
+        delay = initial_interval
+        reported = None
+        while True:
+            pending = [i for i, operation in enumerate(operations) if not operation.done]
+            if not pending:
+                return operations
+            if time.monotonic() >= deadline:
+                raise UploadTimeoutError(
+                    operations, [getattr(operations[i], 'name', str(i)) for i in pending], timeout
+                )
+            if len(pending) != reported:
+                print(f"⏳ Processing {len(pending)} upload(s)...")
+                reported = len(pending)
+            time.sleep(_jittered(delay))
+            delay = min(delay * POLL_BACKOFF, max_interval)
+            for i in pending:
+                operations[i] = self.client.operations.get(operations[i])
+    
     def upload_document(
         self, 
         file_path: str, 
         store_name: str, 
         display_name: Optional[str] = None,
-        chunking_config: Optional[Dict[str, Any]] = None
+        chunking_config: Optional[Dict[str, Any]] = None,
+        file_stat: Optional[os.stat_result] = None,
+        custom_metadata: Optional[List[Dict[str, Any]]] = None
     ) -> str:
         """
         Upload a document directly to a File Search store.
@@ -112,45 +374,21 @@ class FileSearchClient:
             store_name: Full resource name of the target store
             display_name: Optional display name for the file
             chunking_config: Optional chunking configuration
+            file_stat: Stat result from earlier validation, to avoid re-statting
+            custom_metadata: Optional custom metadata entries ({'key': ..., 'string_value': ...})
             
         Returns:
             Operation name
         """
         try:
-            file_path_obj = Path(file_path)
-            if not file_path_obj.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-            
-            # Check file size
-            file_size_mb = file_path_obj.stat().st_size / (1024 * 1024)
-            if file_size_mb > settings.max_file_size_mb:
-                raise ValueError(f"File size ({file_size_mb:.1f}MB) exceeds limit ({settings.max_file_size_mb}MB)")
-            
-            print(f"🔄 Uploading {file_path_obj.name} ({file_size_mb:.1f}MB)...")
-            
-            # Prepare config
-            upload_config = {
-                'display_name': display_name or file_path_obj.name
-            }
-            
-            # Add chunking config if provided
-            if chunking_config:
-                upload_config['chunking_config'] = chunking_config
-            
-            # Upload directly to file search store
-            operation = self.client.file_search_stores.upload_to_file_search_store(
-                file=str(file_path_obj),
-                file_search_store_name=store_name,
-                config=upload_config
+            operation = self.start_upload(
+                file_path, store_name, display_name, chunking_config, file_stat, custom_metadata
             )
             
             # Wait for operation to complete
-            while not operation.done:
-                print("⏳ Processing upload...")
-                time.sleep(5)
-                operation = self.client.operations.get(operation)
+            operation = self.wait_for_operations([operation])[0]
             
-            print(f"✅ Successfully uploaded: {file_path_obj.name}")
+            print(f"✅ Successfully uploaded: {Path(file_path).name}")
             return operation.name
             
         except Exception as e:
@@ -180,13 +418,20 @@ class FileSearchClient:
             except ImportError:
                 raise ImportError("httpx is required for URL uploads. Install with: pip install httpx")
             
-            # Download the file temporarily
-            response = httpx.get(url)
-            response.raise_for_status()
-            
-            # Create temporary file
-            temp_file = Path(f"temp_{int(time.time())}_{url.split('/')[-1]}")
-            temp_file.write_bytes(response.content)
+            # Stream the download straight into a uniquely named temporary file
+            # so large documents are never held in memory
+            suffix = Path(urlparse(url).path).suffix
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp:
+                temp_file = Path(temp.name)
+                try:
+                    with httpx.stream("GET", url) as response:
+                        response.raise_for_status()
+                        for chunk in response.iter_bytes(chunk_size=1 << 20):
+                            temp.write(chunk)
+                except Exception:
+                    temp.close()
+                    temp_file.unlink()
+                    raise
             
             try:
                 # Upload the file
@@ -205,35 +450,106 @@ class FileSearchClient:
             print(f"❌ Error uploading from URL '{url}': {e}")
             raise
     
-    def list_files_in_store(self, store_name: str) -> List[Dict[str, Any]]:
+    def list_files_in_store(self, store_name: str, refresh: bool = False) -> FileListing:
         """
         List all files/documents in a File Search store.
         
+        Listings are cached for a short time and invalidated by uploads to
+        and deletion of the store. Repeated calls share one immutable listing
+        rather than copying it.
+        
         Args:
             store_name: Full resource name of the store
+            refresh: Bypass the cache and fetch a fresh listing
             
         Returns:
-            List of file information dictionaries
+            Tuple of file information dictionaries
         """
+        if not refresh:
+            cached = self._cached_files(store_name)
+            if cached is not None:
+                return cached
+        
         try:
             # The documents are accessed via the store
             # Using file_search_stores documents list if available
             files = []
             # Note: The API may vary - adjust based on actual SDK capabilities
             try:
-                for doc in self.client.file_search_stores.list_documents(name=store_name):
-                    files.append({
-                        'name': doc.name,
-                        'display_name': getattr(doc, 'display_name', doc.name),
-                        'size_bytes': getattr(doc, 'size_bytes', 0)
-                    })
+                documents_api = getattr(self.client.file_search_stores, 'documents', None)
+                if documents_api is not None:
+                    docs = documents_api.list(parent=store_name)
+                else:
+                    docs = self.client.file_search_stores.list_documents(name=store_name)
+                files = [self._file_info(doc) for doc in docs]
             except AttributeError:
                 # Fallback: the list_documents may not be available in all SDK versions
                 print("⚠️  Document listing not available in this SDK version")
-            return files
+            return self._cache_files(store_name, files)
         except Exception as e:
             print(f"❌ Error listing files in store '{store_name}': {e}")
-            return []
+            return ()
+    
+    def list_files_in_stores(
+        self,
+        store_names: List[str],
+        max_workers: int = ASYNC_MAX_CONCURRENCY
+    ) -> Dict[str, FileListing]:
+        """
+        List the files of several stores concurrently on a thread pool.
+        
+        Unlike a_list_files_in_stores, this is safe to call repeatedly from sync
+        code: each asyncio.run starts a new event loop, while the client's async
+        HTTP pool stays bound to the first one.
+        
+        Args:
+            store_names: Full resource names of the stores
+            max_workers: Maximum number of listings in flight at once
+            
+        Returns:
+            Mapping of store name to its file information dictionaries
+        """
+        if not store_names:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(store_names)))) as executor:
+            return dict(zip(store_names, executor.map(self.list_files_in_store, store_names)))
+    
+    def wait_for_indexing(
+        self,
+        store_name: str,
+        expected_count: int,
+        timeout: float = 30.0,
+        interval: float = 0.5
+    ) -> bool:
+        """
+        Poll a store until its documents are indexed and ready for search.
+        
+        Args:
+            store_name: Full resource name of the store
+            expected_count: Number of documents that should be present
+            timeout: Maximum number of seconds to wait
+            interval: Seconds to sleep between status checks
+            
+        Returns:
+            True once no document is still pending, False on timeout or failure
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            files = self.list_files_in_store(store_name, refresh=True)
+            states = [f.get('state') for f in files]
+            if any(state == types.DocumentState.STATE_FAILED for state in states):
+                print(f"⚠️  Some documents failed to index in store '{store_name}'")
+                return False
+            # Only pending documents are still being indexed; an unset or
+            # unspecified state means the API has nothing more to report
+            if len(files) >= expected_count and not any(
+                state == types.DocumentState.STATE_PENDING for state in states
+            ):
+                return True
+            if time.monotonic() >= deadline:
+                print(f"⚠️  Timed out waiting for indexing in store '{store_name}'")
+                return False
+            time.sleep(interval)
     
     def get_store_by_name(self, display_name: str) -> Optional[str]:
         """
@@ -250,16 +566,283 @@ class FileSearchClient:
             if display_name.startswith('fileSearchStores/'):
                 return display_name
             
-            # Search through stores
-            for store in self.client.file_search_stores.list():
-                store_display = getattr(store, 'display_name', '')
-                if store_display == display_name or store.name == display_name:
-                    return store.name
-            return None
+            # Look up the cached index first; on a miss (or before the first
+            # listing), refresh once in case the store was created elsewhere
+            with self._stores_lock:
+                store_id = self._stores_index.get(display_name)
+            if store_id is None:
+                self.refresh_stores()
+                with self._stores_lock:
+                    store_id = self._stores_index.get(display_name)
+            return store_id
         except Exception as e:
             print(f"❌ Error searching for store '{display_name}': {e}")
             return None
     
+    def get_stores_by_names(self, display_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve several store display names, refreshing the store list at most once.
+        
+        Args:
+            display_names: Display names (or resource names) to resolve
+            
+        Returns:
+            Dictionary mapping each input name to its resource name, or None if not found
+        """
+        try:
+            def lookup() -> Dict[str, Optional[str]]:
+                with self._stores_lock:
+                    return {
+                        name: name if name.startswith('fileSearchStores/') else self._stores_index.get(name)
+                        for name in display_names
+                    }
+            
+            resolved = lookup()
+            if None in resolved.values():
+                self.refresh_stores()
+                resolved = lookup()
+            return resolved
+        except Exception as e:
+            print(f"❌ Error resolving stores {', '.join(display_names)}: {e}")
+            return dict.fromkeys(display_names)
+    
+    async def a_list_stores(self) -> List[Dict[str, Any]]:
+        """
+        Async variant of list_stores, sharing the same cache.
+        
+        Returns:
+            List of store information dictionaries
+        """
+        with self._stores_lock:
+            if self._stores_cache is not None:
+                return list(self._stores_cache)
+        try:
+            pager = await self.client.aio.file_search_stores.list()
+            stores = [self._store_info(store) async for store in pager]
+            with self._stores_lock:
+                self._set_stores(stores)
+            return list(stores)
+        except Exception as e:
+            print(f"❌ Error listing stores: {e}")
+            raise
+    
+    async def a_list_files_in_store(self, store_name: str, refresh: bool = False) -> FileListing:
+        """
+        Async variant of list_files_in_store, sharing the same cache.
+        
+        Args:
+            store_name: Full resource name of the store
+            refresh: Bypass the cache and fetch a fresh listing
+            
+        Returns:
+            Tuple of file information dictionaries
+        """
+        if not refresh:
+            cached = self._cached_files(store_name)
+            if cached is not None:
+                return cached
+        
+        try:
+            pager = await self.client.aio.file_search_stores.documents.list(parent=store_name)
+            files = [self._file_info(doc) async for doc in pager]
+            return self._cache_files(store_name, files)
+        except Exception as e:
+            print(f"❌ Error listing files in store '{store_name}': {e}")
+            return ()
+    
+    async def a_list_files_in_stores(
+        self,
+        store_names: List[str],
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY
+    ) -> Dict[str, FileListing]:
+        """
+        List the files of several stores concurrently.
+        
+        Args:
+            store_names: Full resource names of the stores
+            max_concurrency: Maximum number of listings in flight at once
+            
+        Returns:
+            Mapping of store name to its file information dictionaries
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def list_one(store_name: str) -> FileListing:
+            async with semaphore:
+                return await self.a_list_files_in_store(store_name)
+        
+        file_lists = await asyncio.gather(*(list_one(name) for name in store_names))
+        return dict(zip(store_names, file_lists))
+    
+    async def a_upload_document(
+        self,
+        file_path: str,
+        store_name: str,
+        display_name: Optional[str] = None,
+        chunking_config: Optional[Dict[str, Any]] = None,
+        initial_interval: float = 0.1,
+        max_interval: float = 2.0,
+        timeout: float = UPLOAD_TIMEOUT_SECONDS,
+        file_stat: Optional[os.stat_result] = None
+    ) -> str:
+        """
+        Async variant of upload_document.
+        
+        Args:
+            file_path: Path to the file to upload
+            store_name: Full resource name of the target store
+            display_name: Optional display name for the file
+            chunking_config: Optional chunking configuration
+            initial_interval: Seconds to sleep before the first status check
+            max_interval: Upper bound on the sleep between status checks
+            timeout: Maximum number of seconds to wait for processing
+            file_stat: Stat result from earlier validation, to avoid re-statting
+            
+        Returns:
+            Operation name
+        """
+        try:
+            file_path_obj, upload_config = self._prepare_upload(file_path, display_name, chunking_config, file_stat)
+            operation = await self.client.aio.file_search_stores.upload_to_file_search_store(
+                file=str(file_path_obj),
+                file_search_store_name=store_name,
+                config=upload_config
+            )
+            self._invalidate_files(store_name)
+            
+            deadline = time.monotonic() + timeout
+            delay = initial_interval
+            while not operation.done:
+                if time.monotonic() >= deadline:
+                    raise UploadTimeoutError([operation], [operation.name], timeout)
+                await asyncio.sleep(_jittered(delay))
+                delay = min(delay * POLL_BACKOFF, max_interval)
+                operation = await self.client.aio.operations.get(operation)
+            
+            print(f"✅ Successfully uploaded: {file_path_obj.name}")
+            return operation.name
+            
+        except Exception as e:
+            print(f"❌ Error uploading file '{file_path}': {e}")
+            raise
+    
+    async def a_upload_documents(
+        self,
+        file_paths: List[str],
+        store_name: str,
+        display_names: Optional[List[Optional[str]]] = None,
+        chunking_config: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+        file_stats: Optional[List[Optional[os.stat_result]]] = None
+    ) -> List[Optional[str]]:
+        """
+        Upload several documents concurrently.
+        
+        Args:
+            file_paths: Paths of the files to upload
+            store_name: Full resource name of the target store
+            display_names: Optional display names, one per file
+            chunking_config: Optional chunking configuration for every file
+            max_concurrency: Maximum number of uploads in flight at once
+            file_stats: Optional stat results from earlier validation, one per file
+            
+        Returns:
+            Operation names in input order (None for files that failed)
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def upload_one(
+            file_path: str,
+            display_name: Optional[str],
+            file_stat: Optional[os.stat_result]
+        ) -> str:
+            async with semaphore:
+                return await self.a_upload_document(
+                    file_path, store_name, display_name, chunking_config, file_stat=file_stat
+                )
+        
+        results = await asyncio.gather(
+            *(upload_one(path, name, stat) for path, name, stat in zip(
+                file_paths,
+                display_names or [None] * len(file_paths),
+                file_stats or [None] * len(file_paths)
+            )),
+            return_exceptions=True
+        )
+        # a_upload_document has already reported each failure
+        return [None if isinstance(result, BaseException) else result for result in results]
+    
+    def _file_info(self, doc: Any) -> Dict[str, Any]:
+        """Convert an API document object into a file information dictionary."""
+        return {
+            'name': doc.name,
+            'display_name': getattr(doc, 'display_name', doc.name),
+            'size_bytes': getattr(doc, 'size_bytes', 0),
+            'state': getattr(doc, 'state', None),
+            'custom_metadata': {
+                entry.key: entry.string_value
+                for entry in getattr(doc, 'custom_metadata', None) or []
+            }
+        }
+    
+    def _cached_files(self, store_name: str) -> Optional[FileListing]:
+        """Return a store's cached file listing if it is still fresh."""
+        with self._files_lock:
+            cached = self._files_cache.get(store_name)
+            if cached is None:
+                return None
+            if cached[0] <= time.monotonic():
+                # Evict so listings of stores no longer queried don't linger
+                del self._files_cache[store_name]
+                return None
+        return cached[1]
+    
+    def _cache_files(self, store_name: str, files: List[Dict[str, Any]]) -> FileListing:
+        """Cache a store's file listing and return the shared immutable copy."""
+        listing = tuple(files)
+        with self._files_lock:
+            previous = self._files_cache.get(store_name)
+            self._files_cache[store_name] = (time.monotonic() + FILES_CACHE_TTL_SECONDS, listing)
+        if previous is None or previous[1] != listing:
+            self._bump_version()
+        return listing
+    
+    def _invalidate_files(self, store_name: str) -> None:
+        """Drop the cached file listing and fingerprint for a store."""
+        with self._files_lock:
+            self._files_cache.pop(store_name, None)
+            self._fingerprints.pop(store_name, None)
+        self._bump_version()
+    
+    def get_version(self) -> int:
+        """
+        Get a counter that changes whenever cached store or file listings change.
+        
+        Pollers can compare it with the value from their last call and skip
+        re-rendering (or re-requesting) when it is unchanged.
+        
+        Returns:
+            Current listing version
+        """
+        with self._version_lock:
+            return self._version
+    
+    def _bump_version(self) -> None:
+        """Record that a store or file listing changed."""
+        with self._version_lock:
+            self._version += 1
+    
+    def _set_stores(self, stores: List[Dict[str, Any]]) -> None:
+        """Replace the cached store list and its name index (caller holds _stores_lock)."""
+        if stores != self._stores_cache:
+            self._bump_version()
+        self._stores_cache = stores
+        index: Dict[str, str] = {}
+        for store in stores:
+            # The first store with a given display name wins, as in a linear scan
+            index.setdefault(store['display_name'], store['name'])
+        self._stores_index = index
+    
     def get_client(self) -> genai.Client:
         """
         Get the underlying genai Client for advanced operations.
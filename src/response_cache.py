@@ -0,0 +1,98 @@
+"""
+Persistent cache for generated search responses.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from src.response_handler import Citation, SearchResponse
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "rag" / "responses.sqlite3"
+
+class ResponseCache:
+    """SQLite-backed cache of SearchResponse objects with a time-to-live."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 3600):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Database file path (defaults to ~/.cache/rag/responses.sqlite3)
+            ttl_seconds: How long cached responses stay valid
+        """
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: object) -> str:
+        """Build a stable cache key from the given parts."""
+        return hashlib.sha256("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[SearchResponse]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached SearchResponse, or None if missing or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, payload FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        expires_at, payload = row
+        if expires_at < time.time():
+            with self._lock:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+            return None
+
+        data = json.loads(payload)
+        data['citations'] = [Citation(**citation) for citation in data['citations']]
+        return SearchResponse(**data)
+
+    def set(self, key: str, response: SearchResponse) -> None:
+        """
+        Store a response under the given key.
+
+        Args:
+            key: Cache key from make_key
+            response: Response to cache (the raw API response is not stored)
+        """
+        payload = json.dumps({
+            'answer': response.answer,
+            'citations': [asdict(citation) for citation in response.citations],
+            'model_used': response.model_used,
+            'query': response.query,
+            'grounding_metadata': response.grounding_metadata
+        }, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, expires_at, payload) VALUES (?, ?, ?)",
+                (key, time.time() + self.ttl_seconds, payload)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
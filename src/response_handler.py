@@ -1,10 +1,83 @@
 """
 Response handler for processing API responses and extracting citations.
 """
-from typing import List, Dict, Any, Optional
+import logging
+from collections.abc import Mapping
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+def _uri_basename(uri: str) -> Optional[str]:
+    """Use the last path segment of a URI as its file name."""
+    return uri.split('/')[-1] or None
+
+def _safe_getter(path: str) -> Callable[[Any], Any]:
+    """Build a getter for a dotted attribute path that returns None instead of raising."""
+    names = path.split('.')
+    if len(names) == 1:
+        name = names[0]
+        return lambda obj: getattr(obj, name, None)
+    
+    def get(obj: Any) -> Any:
+        for name in names:
+            obj = getattr(obj, name, None)
+            if obj is None:
+                break
+        return obj
+    
+    return get
+
+def _paths(*candidates: tuple) -> tuple:
+    """Pair each candidate attribute path with a getter built once at import."""
+    return tuple((path, _safe_getter(path), transform) for path, transform in candidates)
+
+# Citation field -> (attribute paths tried in order with an optional transform, default)
+_CHUNK_FIELD_PATHS = (
+    ('file_name', _paths(
+        ('file_name', None),
+        ('source.file_name', None),
+        ('retrieved_context.uri', _uri_basename),
+        ('retrieved_context.title', None),
+    ), "Unknown File"),
+    ('chunk_text', _paths(
+        ('chunk_text', None),
+        ('content', None),
+        ('retrieved_context.text', None),
+    ), ""),
+    ('page_number', _paths(
+        ('page_number', None),
+        ('source.page_number', None),
+    ), None),
+    ('score', _paths(
+        ('score', None),
+        ('relevance_score', None),
+    ), None),
+)
+_get_metadata = _safe_getter('metadata')
+
+def _resolve_field(chunk: Any, getters: tuple, default: Any) -> Any:
+    """Return the first non-None value among a field's candidate getters."""
+    for getter, transform in getters:
+        value = getter(chunk)
+        if value is not None and transform is not None:
+            value = transform(value)
+        if value is not None:
+            return value
+    return default
+
+def _has_attr_path(obj: Any, path: str) -> bool:
+    """Check whether a dotted attribute path can exist on an object."""
+    for name in path.split('.'):
+        if obj is None:
+            # Can't see past a None parent; keep the path and check per chunk
+            return True
+        if not hasattr(obj, name):
+            return False
+        obj = getattr(obj, name)
+    return True
+
+@dataclass(slots=True)
 class Citation:
     """Represents a citation from the search results."""
     file_name: str
@@ -13,7 +86,7 @@ class Citation:
     score: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
 
-@dataclass
+@dataclass(slots=True)
 class SearchResponse:
     """Represents a complete search and generation response."""
     answer: str
@@ -22,6 +95,8 @@ class SearchResponse:
     query: str
     raw_response: Any = None
     grounding_metadata: Optional[Dict[str, Any]] = None
+    # Set when the response could not be processed; such responses are never cached
+    error: Optional[str] = None
 
 class ResponseHandler:
     """Handles processing of API responses and citation extraction."""
@@ -50,11 +125,15 @@ class ResponseHandler:
             # Extract the main answer text
             answer_text = response.text if hasattr(response, 'text') else str(response)
             
+            # Locate the grounding once and share it between both extractors
+            grounding = self._grounding(response)
+            chunks = self._grounding_chunks(response, grounding)
+            
             # Extract citations from grounding metadata
-            citations = self.extract_citations(response)
+            citations = self.extract_citations(response, chunks)
             
             # Extract grounding metadata
-            grounding_metadata = self.extract_grounding_metadata(response)
+            grounding_metadata = self.extract_grounding_metadata(response, grounding, chunks)
             
             return SearchResponse(
                 answer=answer_text,
@@ -72,15 +151,17 @@ class ResponseHandler:
                 citations=[],
                 model_used=model_name,
                 query=query,
-                raw_response=response
+                raw_response=response,
+                error=str(e)
             )
     
-    def extract_citations(self, response: Any) -> List[Citation]:
+    def extract_citations(self, response: Any, chunks: Optional[List[Any]] = None) -> List[Citation]:
         """
         Extract citations from the response grounding metadata.
         
         Args:
             response: Raw API response
+            chunks: Grounding chunks already located in the response (looked up if None)
             
         Returns:
             List of Citation objects
@@ -88,86 +169,168 @@ class ResponseHandler:
         citations = []
         
         try:
-            # Check if response has candidates and grounding metadata
-            if not hasattr(response, 'candidates') or not response.candidates:
+            if chunks is None:
+                chunks = self._grounding_chunks(response)
+            if not chunks:
                 return citations
             
-            candidate = response.candidates[0]
-            if not hasattr(candidate, 'grounding_metadata'):
-                return citations
-            
-            grounding = candidate.grounding_metadata
-            
-            # Extract file search grounding chunks
-            if hasattr(grounding, 'grounding_chunks') and grounding.grounding_chunks:
-                for chunk in grounding.grounding_chunks:
-                    citation = Citation(
-                        file_name=self._extract_file_name(chunk),
-                        chunk_text=self._extract_chunk_text(chunk),
-                        page_number=self._extract_page_number(chunk),
-                        score=self._extract_score(chunk),
-                        metadata=self._extract_chunk_metadata(chunk)
-                    )
-                    citations.append(citation)
+            # Duplicates (same file name and chunk text) are dropped during extraction
+            extract = self._build_chunk_extractor(chunks[0])
+            citations = [citation for citation in map(extract, chunks) if citation is not None]
             
-            # Alternative: Check for file_search_grounding
-            elif hasattr(grounding, 'file_search_grounding') and grounding.file_search_grounding:
-                chunks = grounding.file_search_grounding.grounding_chunks
-                for chunk in chunks:
-                    citation = Citation(
-                        file_name=self._extract_file_name(chunk),
-                        chunk_text=self._extract_chunk_text(chunk),
-                        page_number=self._extract_page_number(chunk),
-                        score=self._extract_score(chunk),
-                        metadata=self._extract_chunk_metadata(chunk)
-                    )
-                    citations.append(citation)
+        except Exception as e:
+            logger.warning("Error extracting citations: %s", e)
+        
+        return citations
+    
+    def extract_citations_by_span(
+        self,
+        response: Any,
+        spans: List[Optional[Tuple[int, int]]]
+    ) -> List[List[Citation]]:
+        """
+        Split a response's citations across character spans of its text.
+        
+        Each grounding support is assigned to the span containing the start of
+        its segment and contributes the chunks it cites. Spans that no support
+        falls in (including None spans) get no citations, as does every span
+        when the response carries no grounding supports.
+        
+        Args:
+            response: Raw API response
+            spans: (start, end) character offsets into response.text, or None
+        
+        Returns:
+            One list of Citation objects per span, in span order
+        """
+        citations = [[] for _ in spans]
+        
+        try:
+            grounding = self._grounding(response)
+            chunks = self._grounding_chunks(response, grounding)
+            supports = getattr(grounding, 'grounding_supports', None)
+            if not chunks or not supports:
+                return citations
             
-            # Remove duplicates based on file name and chunk text
-            citations = self._deduplicate_citations(citations)
+            # Segment offsets count UTF-8 bytes, so convert the span bounds once
+            text = response.text or ""
+            byte_spans = [
+                (len(text[:span[0]].encode()), len(text[:span[1]].encode())) if span else None
+                for span in spans
+            ]
+            chunk_indices = [set() for _ in spans]
+            for support in supports:
+                start = getattr(getattr(support, 'segment', None), 'start_index', None) or 0
+                for indices, byte_span in zip(chunk_indices, byte_spans):
+                    if byte_span and byte_span[0] <= start < byte_span[1]:
+                        indices.update(getattr(support, 'grounding_chunk_indices', None) or ())
+                        break
             
+            for n, indices in enumerate(chunk_indices):
+                # A fresh extractor per span so deduplication stays within one answer
+                extract = self._build_chunk_extractor(chunks[0])
+                selected = (extract(chunks[i]) for i in sorted(indices) if 0 <= i < len(chunks))
+                citations[n] = [citation for citation in selected if citation is not None]
+        
         except Exception as e:
-            print(f"⚠️  Error extracting citations: {e}")
+            logger.warning("Error extracting citations by span: %s", e)
         
         return citations
     
-    def extract_grounding_metadata(self, response: Any) -> Optional[Dict[str, Any]]:
+    def extract_grounding_metadata(
+        self,
+        response: Any,
+        grounding: Any = None,
+        chunks: Optional[List[Any]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Extract complete grounding metadata from response.
         
         Args:
             response: Raw API response
+            grounding: Grounding metadata already located in the response (looked up if None)
+            chunks: Grounding chunks already located in the response (looked up if None)
             
         Returns:
             Grounding metadata dictionary or None
         """
         try:
-            if not hasattr(response, 'candidates') or not response.candidates:
+            if grounding is None:
+                grounding = self._grounding(response)
+            if grounding is None:
                 return None
             
-            candidate = response.candidates[0]
-            if not hasattr(candidate, 'grounding_metadata'):
-                return None
-            
-            grounding = candidate.grounding_metadata
-            
             # Convert to dictionary for easier handling
-            metadata = {
+            if chunks is None:
+                chunks = self._grounding_chunks(response, grounding)
+            return {
                 'support_score': getattr(grounding, 'support_score', None),
-                'grounding_chunks_count': 0
+                'grounding_chunks_count': len(chunks) if chunks else 0
             }
             
-            if hasattr(grounding, 'grounding_chunks') and grounding.grounding_chunks:
-                metadata['grounding_chunks_count'] = len(grounding.grounding_chunks)
-            elif hasattr(grounding, 'file_search_grounding') and grounding.file_search_grounding:
-                if hasattr(grounding.file_search_grounding, 'grounding_chunks'):
-                    metadata['grounding_chunks_count'] = len(grounding.file_search_grounding.grounding_chunks)
-            
-            return metadata
-            
         except Exception as e:
-            print(f"⚠️  Error extracting grounding metadata: {e}")
+            logger.warning("Error extracting grounding metadata: %s", e)
+            return None
+    
+    def _grounding(self, response: Any) -> Optional[Any]:
+        """Get the grounding metadata of the first candidate, if any."""
+        candidates = getattr(response, 'candidates', None)
+        if not candidates:
             return None
+        return getattr(candidates[0], 'grounding_metadata', None)
+    
+    def _grounding_chunks(self, response: Any, grounding: Any = None) -> Optional[List[Any]]:
+        """Get the grounding chunks, checking file_search_grounding as a fallback."""
+        if grounding is None:
+            grounding = self._grounding(response)
+        chunks = getattr(grounding, 'grounding_chunks', None)
+        if chunks:
+            return chunks
+        file_search_grounding = getattr(grounding, 'file_search_grounding', None)
+        return getattr(file_search_grounding, 'grounding_chunks', None)
+    
+    def merge_responses(
+        self,
+        responses: List[SearchResponse],
+        labels: List[str],
+        query: str,
+        model_name: str
+    ) -> SearchResponse:
+        """
+        Combine responses to the same query from separately searched stores.
+        
+        Args:
+            responses: One SearchResponse per store
+            labels: Store names used to label each answer
+            query: Original user query
+            model_name: Name of the model used
+            
+        Returns:
+            SearchResponse with the labelled answers and deduplicated citations
+        """
+        answer = "\n\n".join(
+            f"**{label}:**\n{response.answer}" for label, response in zip(labels, responses)
+        )
+        
+        seen = set()
+        citations = []
+        for response in responses:
+            for citation in response.citations:
+                key = (citation.file_name, citation.chunk_text[:100] if citation.chunk_text else "")
+                if key not in seen:
+                    seen.add(key)
+                    citations.append(citation)
+        
+        chunks_count = sum(
+            (response.grounding_metadata or {}).get('grounding_chunks_count', 0) for response in responses
+        )
+        return SearchResponse(
+            answer=answer,
+            citations=citations,
+            model_used=model_name,
+            query=query,
+            grounding_metadata={'support_score': None, 'grounding_chunks_count': chunks_count}
+        )
     
     def format_response(self, search_response: SearchResponse, include_citations: bool = False) -> str:
         """
@@ -178,10 +341,27 @@ class ResponseHandler:
             include_citations: Whether to include citation information (default: False)
             
         Returns:
-            Formatted response string - only the answer without sources
+            Formatted response string - only the answer unless citations are requested
         """
-        # Return only the answer without any sources
-        return f"**Answer:**\n{search_response.answer}\n"
+        if not include_citations or not search_response.citations:
+            return f"**Answer:**\n{search_response.answer}\n"
+        
+        citations = search_response.citations
+        parts = ["**Answer:**\n", search_response.answer, f"\n\n**Sources ({len(citations)} found):**\n"]
+        append = parts.append
+        for i, citation in enumerate(citations, 1):
+            append(f"{i}. **{citation.file_name}**")
+            if citation.page_number is not None:
+                append(f" (Page {citation.page_number})")
+            if citation.score is not None:
+                append(f" (Relevance: {citation.score:.2f})")
+            append("\n")
+            chunk_text = citation.chunk_text
+            if chunk_text:
+                excerpt = chunk_text[:200] + "..." if len(chunk_text) > 200 else chunk_text
+                append(f"   _{excerpt}_\n")
+            append("\n")
+        return "".join(parts)
     
     def format_citations_only(self, citations: List[Citation]) -> str:
         """
@@ -196,89 +376,60 @@ class ResponseHandler:
         if not citations:
             return "No sources found."
         
-        formatted = f"**Sources ({len(citations)} found):**\n"
+        parts = [f"**Sources ({len(citations)} found):**\n"]
         
         for i, citation in enumerate(citations, 1):
-            formatted += f"{i}. {citation.file_name}"
-            
-            if citation.page_number:
-                formatted += f" (Page {citation.page_number})"
-            
-            formatted += "\n"
+            page = f" (Page {citation.page_number})" if citation.page_number else ""
+            parts.append(f"{i}. {citation.file_name}{page}\n")
         
-        return formatted
-    
-    def _extract_file_name(self, chunk: Any) -> str:
-        """Extract file name from grounding chunk."""
-        try:
-            if hasattr(chunk, 'file_name'):
-                return chunk.file_name
-            elif hasattr(chunk, 'source') and hasattr(chunk.source, 'file_name'):
-                return chunk.source.file_name
-            elif hasattr(chunk, 'retrieved_context'):
-                ctx = chunk.retrieved_context
-                if hasattr(ctx, 'uri'):
-                    return ctx.uri.split('/')[-1]
-                if hasattr(ctx, 'title'):
-                    return ctx.title
-            return "Unknown File"
-        except:
-            return "Unknown File"
-    
-    def _extract_chunk_text(self, chunk: Any) -> str:
-        """Extract chunk text from grounding chunk."""
-        try:
-            if hasattr(chunk, 'chunk_text'):
-                return chunk.chunk_text
-            elif hasattr(chunk, 'content'):
-                return chunk.content
-            elif hasattr(chunk, 'retrieved_context') and hasattr(chunk.retrieved_context, 'text'):
-                return chunk.retrieved_context.text
-            return ""
-        except:
-            return ""
+        return "".join(parts)
     
-    def _extract_page_number(self, chunk: Any) -> Optional[int]:
-        """Extract page number from grounding chunk."""
-        try:
-            if hasattr(chunk, 'page_number'):
-                return chunk.page_number
-            elif hasattr(chunk, 'source') and hasattr(chunk.source, 'page_number'):
-                return chunk.source.page_number
-            return None
-        except:
-            return None
-    
-    def _extract_score(self, chunk: Any) -> Optional[float]:
-        """Extract relevance score from grounding chunk."""
-        try:
-            if hasattr(chunk, 'score'):
-                return chunk.score
-            elif hasattr(chunk, 'relevance_score'):
-                return chunk.relevance_score
-            return None
-        except:
-            return None
-    
-    def _extract_chunk_metadata(self, chunk: Any) -> Optional[Dict[str, Any]]:
-        """Extract metadata from grounding chunk."""
-        try:
-            metadata = {}
-            if hasattr(chunk, 'metadata'):
-                metadata.update(chunk.metadata)
-            return metadata if metadata else None
-        except:
-            return None
-    
-    def _deduplicate_citations(self, citations: List[Citation]) -> List[Citation]:
-        """Remove duplicate citations based on file name and chunk text."""
+    def _build_chunk_extractor(self, sample_chunk: Any) -> Callable[[Any], Optional[Citation]]:
+        """
+        Build a deduplicating Citation extractor specialized to a response's chunks.
+        
+        Chunks in one response share a schema, so attribute paths missing from
+        the sample are dropped once instead of being probed on every chunk.
+        Chunks repeating an earlier file name and text prefix are skipped before
+        their remaining fields are read.
+        
+        Args:
+            sample_chunk: First grounding chunk of the response
+            
+        Returns:
+            Function converting a grounding chunk into a Citation, or None for duplicates
+        """
+        fields = {
+            field: (tuple(
+                (getter, transform)
+                for path, getter, transform in paths
+                if _has_attr_path(sample_chunk, path)
+            ), default)
+            for field, paths, default in _CHUNK_FIELD_PATHS
+        }
+        file_name_field = fields['file_name']
+        chunk_text_field = fields['chunk_text']
+        page_number_field = fields['page_number']
+        score_field = fields['score']
+        has_metadata = _has_attr_path(sample_chunk, 'metadata')
         seen = set()
-        unique_citations = []
+        seen_add = seen.add
         
-        for citation in citations:
-            key = (citation.file_name, citation.chunk_text[:100] if citation.chunk_text else "")
-            if key not in seen:
-                seen.add(key)
-                unique_citations.append(citation)
+        def extract(chunk: Any) -> Optional[Citation]:
+            file_name = _resolve_field(chunk, *file_name_field)
+            chunk_text = _resolve_field(chunk, *chunk_text_field)
+            key = (file_name, chunk_text[:100])
+            if key in seen:
+                return None
+            seen_add(key)
+            
+            metadata = _get_metadata(chunk) if has_metadata else None
+            return Citation(
+                file_name=file_name,
+                chunk_text=chunk_text,
+                page_number=_resolve_field(chunk, *page_number_field),
+                score=_resolve_field(chunk, *score_field),
+                metadata=dict(metadata) if isinstance(metadata, Mapping) and metadata else None
+            )
         
-        return unique_citations
+        return extract
@@ -1,29 +1,141 @@
 """
 Search manager for semantic search, query processing, and result retrieval using File Search tool.
 """
+import asyncio
+import dataclasses
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 from google.genai import types
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 
-from src.file_search_client import FileSearchClient
+from src.file_search_client import ASYNC_MAX_CONCURRENCY, FileSearchClient
 from src.response_handler import ResponseHandler, SearchResponse
-from config.settings import settings
+from src.response_cache import ResponseCache
+from src.semantic_cache import SemanticCache
+from config.settings import get_settings
 from config.prompts import PromptTemplates
 
+# Matches an "[n]" answer label in a batched response; group 1 is set when
+# the label starts a line
+_BATCH_ANSWER_RE = re.compile(r'(^[ \t]*)?\[(\d+)\]', re.MULTILINE)
+
+_NO_BATCH_ANSWER = "No answer was returned for this question."
+
+def _answers_from_spans(text: str, spans: List[Optional[Tuple[int, int]]]) -> List[str]:
+    """Cut each located answer out of a batched response, with a placeholder for missing ones."""
+    return [text[span[0]:span[1]].strip() if span else _NO_BATCH_ANSWER for span in spans]
+
+def _fan_out(queries: List[str], positions: List[int], answers: List[SearchResponse]) -> List[SearchResponse]:
+    """
+    Give every input query its own copy of the answer to the query it was merged into.
+    
+    Each copy carries the caller's query text and its own citation list, so
+    results for duplicate queries can be changed independently.
+    """
+    return [
+        dataclasses.replace(answers[position], query=query, citations=list(answers[position].citations))
+        for query, position in zip(queries, positions)
+    ]
+
+# Upper bound on distinct generation configs kept by a SearchManager
+MAX_SEARCH_CONFIGS = 64
+
+class _RateLimiter:
+    """Token-bucket limiter on request starts, shared by threads or coroutines."""
+    
+    def __init__(self, interval: float, burst: int = 1):
+        """
+        Args:
+            interval: Seconds needed to refill one token (1 / requests per second)
+            burst: Bucket size; this many requests may start back to back
+        """
+        self.interval = interval
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        # Time at which the bucket would be full again (GCRA theoretical arrival time)
+        self._full_at = time.monotonic()
+    
+    def reserve(self) -> float:
+        """
+        Take a token, returning how many seconds to wait before starting.
+        
+        Callers sleep outside the limiter, so a slow response never delays
+        other requests whose tokens are already available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            full_at = max(self._full_at, now)
+            start = max(now, full_at - (self.burst - 1) * self.interval)
+            self._full_at = full_at + self.interval
+        return start - now
+
+class _StreamCollector:
+    """Accumulates streamed generation chunks into a final SearchResponse."""
+    
+    def __init__(self, on_text: Callable[[str], None]):
+        self.on_text = on_text
+        self.parts: List[str] = []
+        self.last_chunk = None
+        self.grounded_chunk = None
+    
+    def add(self, chunk: Any) -> None:
+        """Forward a chunk's text and remember the chunk carrying grounding metadata."""
+        if chunk.text:
+            self.parts.append(chunk.text)
+            self.on_text(chunk.text)
+        # Grounding metadata arrives with the final chunks
+        if chunk.candidates and getattr(chunk.candidates[0], 'grounding_metadata', None):
+            self.grounded_chunk = chunk
+        self.last_chunk = chunk
+    
+    def response(self, handler: ResponseHandler, query: str, model_name: str) -> SearchResponse:
+        """Build the full response from the collected chunks."""
+        search_response = handler.process_response(
+            response=self.grounded_chunk or self.last_chunk,
+            query=query,
+            model_name=model_name
+        )
+        search_response.answer = "".join(self.parts)
+        return search_response
+
 class SearchManager:
     """Manages search operations using Google AI File Search tool."""
 
-    def __init__(self, client: FileSearchClient, model_name: Optional[str] = None):
+    def __init__(
+        self,
+        client: FileSearchClient,
+        model_name: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        context_cache_ttl: Optional[int] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
         """
         Initialize SearchManager.
 
         Args:
             client: FileSearchClient instance
             model_name: Model to use for generation (defaults to settings)
+            cache: Optional response cache; repeated queries are answered from it
+            context_cache_ttl: Seconds to keep a Gemini context cache of the
+                system prompt and File Search tool (disabled when None)
+            semantic_cache: Optional cache that reuses answers to near-duplicate queries
         """
         self.client = client
-        self.model_name = model_name or settings.default_model
+        self.model_name = model_name or get_settings().default_model
         self.response_handler = ResponseHandler()
+        self.cache = cache
+        self.context_cache_ttl = context_cache_ttl
+        self.semantic_cache = semantic_cache
+        # (model, stores, system prompt) -> (cached content name or None, expiry)
+        self._context_caches: Dict[tuple, tuple] = {}
+        # (stores, system prompt, temperature, max tokens) -> reusable generation config
+        self._search_configs: Dict[tuple, types.GenerateContentConfig] = {}
+        # Models already confirmed accessible, and per-model managers sharing this client
+        self._validated_models = {self.model_name}
+        self._model_managers: Dict[str, "SearchManager"] = {}
 
     def search_and_generate(
         self,
@@ -31,7 +143,9 @@ class SearchManager:
         store_name: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.0,
-        max_tokens: Optional[int] = 1024
+        max_tokens: Optional[int] = 1024,
+        no_cache: bool = False,
+        query_embedding: Optional[List[float]] = None
     ) -> SearchResponse:
         """
         Perform semantic search and generate response using File Search tool.
@@ -42,39 +156,31 @@ class SearchManager:
             system_prompt: Optional system prompt override
             temperature: Generation temperature (0.0-1.0)
             max_tokens: Maximum tokens in response
+            no_cache: Neither read nor store cached answers (e.g. for sensitive prompts)
+            query_embedding: Normalized query embedding computed earlier (e.g. for a
+                whole batch), so the semantic cache doesn't embed the query again
 
         Returns:
             SearchResponse with answer and citations
         """
         try:
+            cache_key, semantic_scope, embedding, cached = self._lookup_cached(
+                query, store_name, system_prompt, temperature, max_tokens, no_cache, query_embedding
+            )
+            if cached is not None:
+                return cached
+            
             # Resolve store name if needed
             resolved_store = self.client.get_store_by_name(store_name)
             if not resolved_store:
-                return SearchResponse(
-                    answer=f"Store '{store_name}' not found. Please create one first using 'create-store' command.",
-                    citations=[],
-                    model_used=self.model_name,
-                    query=query
-                )
+                return self._store_not_found(store_name, query)
             
             # Prepare the prompt
             formatted_query = PromptTemplates.format_search_prompt(query)
             
             print(f"🔍 Searching in store '{store_name}' for: {query[:100]}...")
             
-            # Build the generation config with File Search tool
-            gen_config = types.GenerateContentConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-                system_instruction=system_prompt or PromptTemplates.RAG_SYSTEM_PROMPT,
-                tools=[
-                    types.Tool(
-                        file_search=types.FileSearch(
-                            file_search_store_names=[resolved_store]
-                        )
-                    )
-                ]
-            )
+            gen_config = self._build_search_config(resolved_store, system_prompt, temperature, max_tokens)
             
             # Generate response with File Search grounding
             response = self.client.get_client().models.generate_content(
@@ -90,6 +196,8 @@ class SearchManager:
                 model_name=self.model_name
             )
             
+            self._store_cached(cache_key, semantic_scope, embedding, search_response)
+            
             print(f"✅ Generated response with File Search grounding")
             return search_response
             
@@ -100,24 +208,459 @@ class SearchManager:
                 answer=f"Error processing query: {e}",
                 citations=[],
                 model_used=self.model_name,
-                query=query
+                query=query,
+                error=str(e)
+            )
+    
+    async def a_search_and_generate(
+        self,
+        query: str,
+        store_name: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: Optional[int] = 1024,
+        no_cache: bool = False,
+        query_embedding: Optional[List[float]] = None
+    ) -> SearchResponse:
+        """
+        Async variant of search_and_generate, sharing the same caches.
+        
+        Generation goes through the async Gemini client; cache lookups and store
+        resolution run in a worker thread so they never block the event loop.
+        
+        Args:
+            query: User query
+            store_name: File Search store name (resource ID)
+            system_prompt: Optional system prompt override
+            temperature: Generation temperature (0.0-1.0)
+            max_tokens: Maximum tokens in response
+            no_cache: Neither read nor store cached answers (e.g. for sensitive prompts)
+            query_embedding: Normalized query embedding computed earlier
+            
+        Returns:
+            SearchResponse with answer and citations
+        """
+        try:
+            cache_key, semantic_scope, embedding, cached = await asyncio.to_thread(
+                self._lookup_cached,
+                query, store_name, system_prompt, temperature, max_tokens, no_cache, query_embedding
+            )
+            if cached is not None:
+                return cached
+            
+            resolved_store = await asyncio.to_thread(self.client.get_store_by_name, store_name)
+            if not resolved_store:
+                return self._store_not_found(store_name, query)
+            
+            print(f"🔍 Searching in store '{store_name}' for: {query[:100]}...")
+            
+            gen_config = await asyncio.to_thread(
+                self._build_search_config, resolved_store, system_prompt, temperature, max_tokens
+            )
+            response = await self.client.get_client().aio.models.generate_content(
+                model=self.model_name,
+                contents=PromptTemplates.format_search_prompt(query),
+                config=gen_config
+            )
+            
+            search_response = self.response_handler.process_response(
+                response=response,
+                query=query,
+                model_name=self.model_name
+            )
+            
+            await asyncio.to_thread(self._store_cached, cache_key, semantic_scope, embedding, search_response)
+            
+            print(f"✅ Generated response with File Search grounding")
+            return search_response
+            
+        except Exception as e:
+            print(f"❌ Error during search and generation: {e}")
+            return SearchResponse(
+                answer=f"Error processing query: {e}",
+                citations=[],
+                model_used=self.model_name,
+                query=query,
+                error=str(e)
             )
     
+    def _lookup_cached(
+        self,
+        query: str,
+        store_name: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        no_cache: bool,
+        query_embedding: Optional[List[float]]
+    ) -> tuple:
+        """
+        Look for a cached answer, first to the exact query and then to a rephrasing.
+        
+        Returns:
+            Tuple of (response cache key, semantic scope, query embedding, cached
+            response); the key and embedding are None when there is nothing to store
+        """
+        if no_cache:
+            return None, None, None, None
+        
+        # Serve repeated queries from the cache without calling the model
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._search_cache_key(query, store_name, system_prompt, temperature, max_tokens)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                print(f"⚡ Using cached response for: {query[:100]}")
+                return cache_key, None, None, cached
+        
+        # Then look for an answer to a rephrasing of the same question
+        semantic_scope, embedding, similar = self._semantic_lookup(
+            query, store_name, system_prompt, temperature, max_tokens, query_embedding
+        )
+        if similar is not None:
+            print(f"⚡ Using cached response to a similar query: {similar.query[:100]}")
+        return cache_key, semantic_scope, embedding, similar
+    
+    def _store_cached(
+        self,
+        cache_key: Optional[str],
+        semantic_scope: Any,
+        embedding: Optional[List[float]],
+        search_response: SearchResponse
+    ) -> None:
+        """Store a generated answer in the caches it was looked up in, unless processing it failed."""
+        if search_response.error is not None:
+            return
+        if cache_key is not None:
+            self.cache.set(cache_key, search_response)
+        if embedding is not None:
+            self.semantic_cache.add(semantic_scope, embedding, search_response)
+    
+    def _store_not_found(self, store_name: str, query: str) -> SearchResponse:
+        """Build the response returned when a store name can't be resolved."""
+        return SearchResponse(
+            answer=f"Store '{store_name}' not found. Please create one first using 'create-store' command.",
+            citations=[],
+            model_used=self.model_name,
+            query=query,
+            error=f"Store '{store_name}' not found"
+        )
+    
+    def search_and_generate_stream(
+        self,
+        query: str,
+        store_name: str,
+        on_text: Callable[[str], None],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: Optional[int] = 1024,
+        no_cache: bool = False
+    ) -> SearchResponse:
+        """
+        Perform a search and stream the generated answer as it is produced.
+        
+        Args:
+            query: User query
+            store_name: File Search store name (resource ID)
+            on_text: Called with each piece of answer text as it arrives
+            system_prompt: Optional system prompt override
+            temperature: Generation temperature (0.0-1.0)
+            max_tokens: Maximum tokens in response
+            no_cache: Neither read nor store cached answers (e.g. for sensitive prompts)
+            
+        Returns:
+            SearchResponse with the full answer and citations
+        """
+        try:
+            cache_key, semantic_scope, embedding, cached = self._lookup_cached(
+                query, store_name, system_prompt, temperature, max_tokens, no_cache, None
+            )
+            if cached is not None:
+                on_text(cached.answer)
+                return cached
+            
+            resolved_store = self.client.get_store_by_name(store_name)
+            if not resolved_store:
+                not_found = self._store_not_found(store_name, query)
+                on_text(not_found.answer)
+                return not_found
+            
+            stream = self.client.get_client().models.generate_content_stream(
+                model=self.model_name,
+                contents=PromptTemplates.format_search_prompt(query),
+                config=self._build_search_config(resolved_store, system_prompt, temperature, max_tokens)
+            )
+            
+            collector = _StreamCollector(on_text)
+            for chunk in stream:
+                collector.add(chunk)
+            
+            search_response = collector.response(self.response_handler, query, self.model_name)
+            self._store_cached(cache_key, semantic_scope, embedding, search_response)
+            return search_response
+            
+        except Exception as e:
+            print(f"❌ Error during streamed search and generation: {e}")
+            return SearchResponse(
+                answer=f"Error processing query: {e}",
+                citations=[],
+                model_used=self.model_name,
+                query=query,
+                error=str(e)
+            )
+    
+    async def a_search_and_generate_stream(
+        self,
+        query: str,
+        store_name: str,
+        on_text: Callable[[str], None],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: Optional[int] = 1024,
+        no_cache: bool = False
+    ) -> SearchResponse:
+        """
+        Async variant of search_and_generate_stream using the async Gemini client.
+        
+        Args:
+            query: User query
+            store_name: File Search store name (resource ID)
+            on_text: Called with each piece of answer text as it arrives
+            system_prompt: Optional system prompt override
+            temperature: Generation temperature (0.0-1.0)
+            max_tokens: Maximum tokens in response
+            no_cache: Neither read nor store cached answers (e.g. for sensitive prompts)
+            
+        Returns:
+            SearchResponse with the full answer and citations
+        """
+        try:
+            cache_key, semantic_scope, embedding, cached = await asyncio.to_thread(
+                self._lookup_cached,
+                query, store_name, system_prompt, temperature, max_tokens, no_cache, None
+            )
+            if cached is not None:
+                on_text(cached.answer)
+                return cached
+            
+            resolved_store = await asyncio.to_thread(self.client.get_store_by_name, store_name)
+            if not resolved_store:
+                not_found = self._store_not_found(store_name, query)
+                on_text(not_found.answer)
+                return not_found
+            
+            gen_config = await asyncio.to_thread(
+                self._build_search_config, resolved_store, system_prompt, temperature, max_tokens
+            )
+            stream = await self.client.get_client().aio.models.generate_content_stream(
+                model=self.model_name,
+                contents=PromptTemplates.format_search_prompt(query),
+                config=gen_config
+            )
+            
+            collector = _StreamCollector(on_text)
+            async for chunk in stream:
+                collector.add(chunk)
+            
+            search_response = collector.response(self.response_handler, query, self.model_name)
+            await asyncio.to_thread(self._store_cached, cache_key, semantic_scope, embedding, search_response)
+            return search_response
+            
+        except Exception as e:
+            print(f"❌ Error during streamed search and generation: {e}")
+            return SearchResponse(
+                answer=f"Error processing query: {e}",
+                citations=[],
+                model_used=self.model_name,
+                query=query,
+                error=str(e)
+            )
+    
+    def _search_cache_key(
+        self,
+        query: str,
+        store_name: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int]
+    ) -> Optional[str]:
+        """
+        Build the response cache key for a search request.
+        
+        The key includes the store's fingerprint, so cached answers stop
+        matching once the store's documents change. The key is built once per
+        request and reused for both the lookup and storing the answer.
+        
+        Returns:
+            Cache key, or None when the store's fingerprint is unavailable and
+            the persistent cache must be skipped
+        """
+        resolved_store = self.client.get_store_by_name(store_name)
+        store_version = self.client.get_store_fingerprint(resolved_store) if resolved_store else None
+        if store_version is None:
+            return None
+        return ResponseCache.make_key(
+            # Only surrounding whitespace is ignored; case can matter (e.g. identifiers)
+            self.model_name, store_name, store_version, query.strip(),
+            system_prompt or "", temperature, max_tokens
+        )
+    
+    def _semantic_lookup(
+        self,
+        query: str,
+        store_name: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        embedding: Optional[List[float]] = None
+    ) -> tuple:
+        """
+        Look up a cached answer to a semantically similar query.
+        
+        The query is embedded unless a precomputed embedding is passed.
+        
+        Returns:
+            Tuple of (scope, query embedding, cached response); the embedding is
+            None when no semantic cache is configured or embedding failed
+        """
+        if self.semantic_cache is None:
+            return None, None, None
+        scope = (self.model_name, store_name, system_prompt or "", temperature, max_tokens)
+        if embedding is None:
+            embedding = self.semantic_cache.embed(query)
+        if embedding is None:
+            return scope, None, None
+        return scope, embedding, self.semantic_cache.lookup(scope, embedding)
+    
+    def _build_search_config(
+        self,
+        resolved_store: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int]
+    ) -> types.GenerateContentConfig:
+        """
+        Build the generation config with the File Search tool for one store.
+        
+        Reuses a context cache of the fixed prompt prefix when one is available.
+        """
+        system_instruction = system_prompt or PromptTemplates.RAG_SYSTEM_PROMPT
+        cached_content = self._get_context_cache([resolved_store], system_instruction)
+        if cached_content:
+            return types.GenerateContentConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                cached_content=cached_content
+            )
+        
+        return self._get_search_config((resolved_store,), system_instruction, temperature, max_tokens)
+    
+    def _get_search_config(
+        self,
+        store_names: tuple,
+        system_instruction: str,
+        temperature: float,
+        max_tokens: Optional[int]
+    ) -> types.GenerateContentConfig:
+        """
+        Get a generation config with the File Search tool, reusing an identical earlier one.
+        
+        Settings are usually constant across a session or batch, so the config
+        is built once per combination rather than on every request.
+        """
+        key = (store_names, system_instruction, temperature, max_tokens)
+        config = self._search_configs.get(key)
+        if config is None:
+            if len(self._search_configs) >= MAX_SEARCH_CONFIGS:
+                self._search_configs.clear()
+            config = self._search_configs[key] = types.GenerateContentConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                system_instruction=system_instruction,
+                tools=[
+                    types.Tool(
+                        file_search=types.FileSearch(
+                            file_search_store_names=list(store_names)
+                        )
+                    )
+                ]
+            )
+        return config
+    
+    def _get_context_cache(self, store_names: List[str], system_instruction: str) -> Optional[str]:
+        """
+        Get a Gemini cached-content name for the system prompt and File Search tool.
+        
+        The cache only holds the request prefix; retrieval from the stores still
+        happens per query, so uploads to a store never make the cache stale.
+        
+        Args:
+            store_names: Resolved File Search store names
+            system_instruction: System prompt to cache
+            
+        Returns:
+            Cached content name, or None if context caching is disabled or unavailable
+        """
+        if not self.context_cache_ttl:
+            return None
+        
+        key = (self.model_name, tuple(store_names), system_instruction)
+        entry = self._context_caches.get(key)
+        # Recreate shortly before expiry so requests never reference a dead cache
+        if entry is not None and entry[1] > time.monotonic() + 60:
+            return entry[0]
+        
+        try:
+            cached = self.client.get_client().caches.create(
+                model=self.model_name,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_instruction,
+                    tools=[
+                        types.Tool(
+                            file_search=types.FileSearch(
+                                file_search_store_names=store_names
+                            )
+                        )
+                    ],
+                    ttl=f"{self.context_cache_ttl}s"
+                )
+            )
+            name = cached.name
+        except Exception as e:
+            # e.g. the prefix is below the model's minimum cacheable size
+            print(f"⚠️  Context caching unavailable, sending full prompt: {e}")
+            name = None
+        
+        now = time.monotonic()
+        # Drop expired entries so prompt/store combinations used once don't accumulate
+        self._context_caches = {
+            k: v for k, v in self._context_caches.items() if v[1] > now
+        }
+        self._context_caches[key] = (name, now + self.context_cache_ttl)
+        return name
+    
     def search_multiple_stores(
         self,
         query: str,
         store_names: List[str],
         system_prompt: Optional[str] = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        fan_out: bool = False
     ) -> SearchResponse:
         """
         Search across multiple File Search stores.
         
+        By default one request searches all stores. With fan_out, each store
+        gets its own concurrent request and the answers are combined, so wall
+        time follows the slowest store rather than the total, at the cost of
+        one generation per store.
+        
         Args:
             query: User query
             store_names: List of store names to search
             system_prompt: Optional system prompt override
             temperature: Generation temperature
+            fan_out: Query each store with a separate concurrent request
             
         Returns:
             SearchResponse combining results from all stores
@@ -125,10 +668,13 @@ class SearchManager:
         try:
             # Resolve all store names
             resolved_stores = []
+            found_names = []
+            resolved_names = self.client.get_stores_by_names(store_names)
             for store_name in store_names:
-                resolved = self.client.get_store_by_name(store_name)
+                resolved = resolved_names[store_name]
                 if resolved:
                     resolved_stores.append(resolved)
+                    found_names.append(store_name)
                 else:
                     print(f"⚠️  Store '{store_name}' not found, skipping")
             
@@ -137,7 +683,13 @@ class SearchManager:
                     answer=f"No valid stores found in: {', '.join(store_names)}",
                     citations=[],
                     model_used=self.model_name,
-                    query=query
+                    query=query,
+                    error="No valid stores found"
+                )
+            
+            if fan_out and len(resolved_stores) > 1:
+                return self._search_stores_separately(
+                    query, found_names, resolved_stores, system_prompt, temperature
                 )
             
             formatted_query = PromptTemplates.format_search_prompt(query)
@@ -145,16 +697,11 @@ class SearchManager:
             print(f"🔍 Searching across {len(resolved_stores)} stores for: {query[:100]}...")
             
             # Build config with multiple stores
-            gen_config = types.GenerateContentConfig(
-                temperature=temperature,
-                system_instruction=system_prompt or PromptTemplates.RAG_SYSTEM_PROMPT,
-                tools=[
-                    types.Tool(
-                        file_search=types.FileSearch(
-                            file_search_store_names=resolved_stores
-                        )
-                    )
-                ]
+            gen_config = self._get_search_config(
+                tuple(resolved_stores),
+                system_prompt or PromptTemplates.RAG_SYSTEM_PROMPT,
+                temperature,
+                None
             )
             
             response = self.client.get_client().models.generate_content(
@@ -178,9 +725,31 @@ class SearchManager:
                 answer=f"Error processing multi-store query: {e}",
                 citations=[],
                 model_used=self.model_name,
-                query=query
+                query=query,
+                error=str(e)
             )
     
+    def _search_stores_separately(
+        self,
+        query: str,
+        store_names: List[str],
+        resolved_stores: List[str],
+        system_prompt: Optional[str],
+        temperature: float
+    ) -> SearchResponse:
+        """Search each store with its own concurrent request and merge the answers."""
+        print(f"🔍 Searching {len(resolved_stores)} stores separately for: {query[:100]}...")
+        with ThreadPoolExecutor(max_workers=min(ASYNC_MAX_CONCURRENCY, len(resolved_stores))) as executor:
+            responses = list(executor.map(
+                lambda store: self.search_and_generate(
+                    query, store, system_prompt=system_prompt, temperature=temperature, max_tokens=None
+                ),
+                resolved_stores
+            ))
+        
+        print(f"✅ Found responses from {len(resolved_stores)} stores")
+        return self.response_handler.merge_responses(responses, store_names, query, self.model_name)
+    
     def ask_question(
         self,
         question: str,
@@ -218,7 +787,8 @@ class SearchManager:
                 answer=f"Error processing question: {e}",
                 citations=[],
                 model_used=self.model_name,
-                query=question
+                query=question,
+                error=str(e)
             )
     
     def summarize_documents(
@@ -237,13 +807,8 @@ class SearchManager:
             SearchResponse with document summary
         """
         try:
-            if focus_topic:
-                query = f"{PromptTemplates.SUMMARIZATION_PROMPT}\n\nFocus particularly on information related to: {focus_topic}"
-            else:
-                query = PromptTemplates.SUMMARIZATION_PROMPT
-            
             return self.search_and_generate(
-                query=query,
+                query=PromptTemplates.format_summary_prompt(focus_topic),
                 store_name=store_name,
                 temperature=0.3,  # Slightly more creative for summaries
                 max_tokens=3072
@@ -255,7 +820,8 @@ class SearchManager:
                 answer=f"Error generating summary: {e}",
                 citations=[],
                 model_used=self.model_name,
-                query="Document summarization"
+                query="Document summarization",
+                error=str(e)
             )
     
     def get_model_info(self) -> Dict[str, Any]:
@@ -291,8 +857,10 @@ class SearchManager:
             True if successful, False otherwise
         """
         try:
-            # Test if model exists and is accessible
-            self.client.get_client().models.get(name=f"models/{model_name}")
+            # Test if model exists and is accessible (once per model)
+            if model_name not in self._validated_models:
+                self.client.get_client().models.get(name=f"models/{model_name}")
+                self._validated_models.add(model_name)
             self.model_name = model_name
             print(f"✅ Switched to model: {model_name}")
             return True
@@ -300,46 +868,353 @@ class SearchManager:
             print(f"❌ Error switching to model '{model_name}': {e}")
             return False
     
+    def clear_cache(self) -> None:
+        """Drop all cached responses, if a cache is configured."""
+        if self.cache is not None:
+            self.cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+    
+    def get_manager_for(self, model_name: str) -> Optional["SearchManager"]:
+        """
+        Get a SearchManager bound to a specific model.
+        
+        Managers share this manager's client and are cached per model, so
+        comparing models repeatedly does not re-validate or switch state back
+        and forth on this instance.
+        
+        Args:
+            model_name: Name of the model
+            
+        Returns:
+            SearchManager for the model, or None if the model is not accessible
+        """
+        if model_name == self.model_name:
+            return self
+        
+        manager = self._model_managers.get(model_name)
+        if manager is None:
+            manager = SearchManager(
+                self.client,
+                cache=self.cache,
+                context_cache_ttl=self.context_cache_ttl,
+                semantic_cache=self.semantic_cache
+            )
+            manager._validated_models |= self._validated_models
+            if not manager.set_model(model_name):
+                return None
+            self._validated_models.add(model_name)
+            self._model_managers[model_name] = manager
+        return manager
+    
     def batch_search(
         self,
         queries: List[str],
         store_name: str,
-        delay_seconds: float = 1.0
+        delay_seconds: float = 1.0,
+        max_workers: int = 8,
+        burst: int = 1
     ) -> List[SearchResponse]:
         """
-        Process multiple queries with rate limiting.
+        Process multiple queries concurrently with rate limiting.
+        
+        Request starts are rate limited by a token bucket refilled once every
+        delay_seconds; each request only waits for its token, not for earlier
+        responses to come back.
+        Repeated (and, with a semantic cache, near-duplicate) queries are
+        answered once, and embeddings for the whole batch are fetched in a
+        single request.
         
         Args:
             queries: List of queries to process
             store_name: File Search store to search
-            delay_seconds: Delay between requests
+            delay_seconds: Interval between request starts once the burst is used up
+            max_workers: Maximum number of requests in flight
+            burst: Number of requests allowed to start immediately
             
         Returns:
-            List of SearchResponse objects
+            List of SearchResponse objects, in input order
         """
-        import time
+        if not queries:
+            return []
         
-        results = []
+        positions, unique_queries, embeddings = self._prepare_batch(queries)
+        limiter = _RateLimiter(delay_seconds, burst)
         
-        for i, query in enumerate(queries, 1):
-            print(f"🔄 Processing query {i}/{len(queries)}: {query[:50]}...")
+        def run(i: int, query: str, embedding: Optional[List[float]]) -> SearchResponse:
+            time.sleep(limiter.reserve())
             
+            print(f"🔄 Processing query {i}/{len(unique_queries)}: {query[:50]}...")
             try:
-                response = self.search_and_generate(query, store_name)
-                results.append(response)
-                
-                # Rate limiting
-                if i < len(queries):  # Don't delay after last query
-                    time.sleep(delay_seconds)
-                    
+                return self.search_and_generate(query, store_name, query_embedding=embedding)
             except Exception as e:
                 print(f"❌ Error processing query {i}: {e}")
-                results.append(SearchResponse(
+                return SearchResponse(
                     answer=f"Error processing query: {e}",
                     citations=[],
                     model_used=self.model_name,
-                    query=query
-                ))
+                    query=query,
+                    error=str(e)
+                )
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique_queries)))) as executor:
+            answers = list(executor.map(
+                run, range(1, len(unique_queries) + 1), unique_queries, embeddings
+            ))
+        results = _fan_out(queries, positions, answers)
+        
+        print(f"✅ Completed batch processing of {len(queries)} queries")
+        return results
+    
+    async def a_batch_search(
+        self,
+        queries: List[str],
+        store_name: str,
+        delay_seconds: float = 1.0,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+        burst: int = 1
+    ) -> List[SearchResponse]:
+        """
+        Async variant of batch_search using the async Gemini client.
+        
+        Args:
+            queries: List of queries to process
+            store_name: File Search store to search
+            delay_seconds: Interval between request starts once the burst is used up
+            max_concurrency: Maximum number of requests in flight
+            burst: Number of requests allowed to start immediately
+            
+        Returns:
+            List of SearchResponse objects, in input order
+        """
+        if not queries:
+            return []
+        
+        positions, unique_queries, embeddings = await asyncio.to_thread(self._prepare_batch, queries)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        limiter = _RateLimiter(delay_seconds, burst)
+        
+        async def run(i: int, query: str, embedding: Optional[List[float]]) -> SearchResponse:
+            async with semaphore:
+                # Reserve once a slot is free, like the pool workers in batch_search,
+                # so queued coroutines don't claim tokens they can't use yet
+                await asyncio.sleep(limiter.reserve())
+                
+                print(f"🔄 Processing query {i}/{len(unique_queries)}: {query[:50]}...")
+                return await self.a_search_and_generate(query, store_name, query_embedding=embedding)
+        
+        answers = await asyncio.gather(*(
+            run(i, query, embedding)
+            for i, (query, embedding) in enumerate(zip(unique_queries, embeddings), 1)
+        ))
+        results = _fan_out(queries, positions, answers)
         
         print(f"✅ Completed batch processing of {len(queries)} queries")
         return results
+    
+    def _prepare_batch(self, queries: List[str]) -> tuple:
+        """
+        Collapse repeated queries and embed the rest for the semantic cache.
+        
+        Identical queries (ignoring case and surrounding whitespace) are always
+        merged. With a semantic cache, a query whose embedding is similar enough
+        to an earlier one in the batch is merged into it too, since concurrent
+        requests can't be answered from each other's cache entries.
+        
+        Returns:
+            Tuple of (index into the unique queries for each input query, unique
+            queries, their embeddings), with all embeddings from a single request
+        """
+        first_seen: Dict[str, int] = {}
+        distinct: List[str] = []
+        positions = []
+        for query in queries:
+            key = query.strip().lower()
+            if key not in first_seen:
+                first_seen[key] = len(distinct)
+                distinct.append(query)
+            positions.append(first_seen[key])
+        
+        if self.semantic_cache is None:
+            return positions, distinct, [None] * len(distinct)
+        
+        embeddings = self.semantic_cache.embed_many(distinct)
+        unique_queries, unique_embeddings, merged_into = [], [], []
+        for query, embedding in zip(distinct, embeddings):
+            match = None if embedding is None else self.semantic_cache.match(embedding, unique_embeddings)
+            if match is None:
+                match = len(unique_queries)
+                unique_queries.append(query)
+                unique_embeddings.append(embedding)
+            merged_into.append(match)
+        return [merged_into[position] for position in positions], unique_queries, unique_embeddings
+    
+    def batch_prompt(
+        self,
+        queries: List[str],
+        store_name: str,
+        temperature: float = 0.0,
+        max_tokens_per_query: int = 512
+    ) -> List[SearchResponse]:
+        """
+        Answer multiple queries with a single generation request.
+        
+        The queries are combined into one numbered prompt and the labelled
+        answers are split back out of the response, so N questions cost one
+        round trip instead of N. Each answer's citations come from the
+        grounding supports within its part of the response, so an answer the
+        model grounded nowhere has no citations.
+        
+        Args:
+            queries: List of queries to answer
+            store_name: File Search store to search
+            temperature: Generation temperature
+            max_tokens_per_query: Output token budget per query
+            
+        Returns:
+            List of SearchResponse objects, one per query, in input order
+        """
+        return self._generate_batch(
+            queries,
+            PromptTemplates.format_batch_search_prompt(queries),
+            store_name,
+            temperature,
+            max_tokens_per_query
+        )
+    
+    def ask_questions(
+        self,
+        questions: List[str],
+        store_name: str,
+        max_tokens_per_question: int = 512
+    ) -> List[SearchResponse]:
+        """
+        Ask several direct questions with a single generation request.
+        
+        Args:
+            questions: Questions to ask
+            store_name: File Search store to search
+            max_tokens_per_question: Output token budget per question
+            
+        Returns:
+            List of SearchResponse objects, one per question, in input order
+        """
+        return self._generate_batch(
+            questions,
+            PromptTemplates.format_batch_qa_prompt(questions),
+            store_name,
+            0.0,  # More deterministic for Q&A
+            max_tokens_per_question
+        )
+    
+    def _generate_batch(
+        self,
+        queries: List[str],
+        formatted_query: str,
+        store_name: str,
+        temperature: float,
+        max_tokens_per_query: int
+    ) -> List[SearchResponse]:
+        """Send a numbered multi-question prompt and split the answers per query."""
+        if not queries:
+            return []
+        
+        try:
+            resolved_store = self.client.get_store_by_name(store_name)
+            if not resolved_store:
+                return [self._store_not_found(store_name, query) for query in queries]
+            
+            print(f"🔍 Searching in store '{store_name}' for {len(queries)} queries in one request...")
+            
+            gen_config = self._get_search_config(
+                (resolved_store,),
+                PromptTemplates.RAG_SYSTEM_PROMPT,
+                temperature,
+                max_tokens_per_query * len(queries)
+            )
+            
+            response = self.client.get_client().models.generate_content(
+                model=self.model_name,
+                contents=formatted_query,
+                config=gen_config
+            )
+            
+            combined = self.response_handler.process_response(
+                response=response,
+                query=formatted_query,
+                model_name=self.model_name
+            )
+            # Blocked or empty generations come back with no text at all
+            text = combined.answer or ""
+            if combined.error is None:
+                spans = self._batch_answer_spans(text, len(queries))
+            else:
+                spans = [None] * len(queries)
+            answers = _answers_from_spans(text, spans)
+            # Each answer keeps only the chunks cited by the grounding supports
+            # that fall within its span of the combined text
+            citations = self.response_handler.extract_citations_by_span(response, spans)
+            
+            print(f"✅ Generated {len(queries)} answers with File Search grounding")
+            return [
+                SearchResponse(
+                    answer=answer,
+                    citations=answer_citations,
+                    model_used=self.model_name,
+                    query=query,
+                    raw_response=response,
+                    grounding_metadata=combined.grounding_metadata,
+                    error=combined.error
+                )
+                for query, answer, answer_citations in zip(queries, answers, citations)
+            ]
+            
+        except Exception as e:
+            print(f"❌ Error during batched search: {e}")
+            return [
+                SearchResponse(
+                    answer=f"Error processing query: {e}",
+                    citations=[],
+                    model_used=self.model_name,
+                    query=query,
+                    error=str(e)
+                )
+                for query in queries
+            ]
+    
+    def _split_batch_answers(self, text: str, count: int) -> List[str]:
+        """Split a batched response into per-question answers by their [n] labels."""
+        text = text or ""
+        return _answers_from_spans(text, self._batch_answer_spans(text, count))
+    
+    def _batch_answer_spans(self, text: str, count: int) -> List[Optional[Tuple[int, int]]]:
+        """
+        Locate each labelled answer in a batched response.
+        
+        Labels must increase. One at the start of a line may skip numbers (an
+        answer the model left out); an inline one must be the next number, so
+        "[1] a [2] b" splits while a bracketed reference inside an answer is
+        left alone.
+        
+        Args:
+            text: Combined response text
+            count: Number of questions in the batch
+            
+        Returns:
+            (start, end) character offsets of each answer body, or None when
+            the answer is missing
+        """
+        labels = []
+        last = 0
+        for match in _BATCH_ANSWER_RE.finditer(text):
+            number = int(match.group(2))
+            at_line_start = match.group(1) is not None
+            if last < number <= count and (at_line_start or number == last + 1):
+                labels.append((number - 1, match.start(), match.end()))
+                last = number
+        
+        spans = [None] * count
+        for n, (index, _, body_start) in enumerate(labels):
+            end = labels[n + 1][1] if n + 1 < len(labels) else len(text)
+            spans[index] = (body_start, end)
+        return spans
@@ -0,0 +1,174 @@
+"""
+In-memory cache that answers near-duplicate queries by embedding similarity.
+"""
+import math
+import threading
+import time
+from operator import mul
+from typing import Hashable, List, Optional, Tuple
+
+from google import genai
+
+from src.response_handler import SearchResponse
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-004"
+
+def _normalize(values: List[float]) -> Optional[List[float]]:
+    """Scale a vector to unit length, or return None for a zero vector."""
+    norm = math.sqrt(sum(v * v for v in values))
+    if not norm:
+        return None
+    return [v / norm for v in values]
+
+class SemanticCache:
+    """Caches SearchResponse objects keyed by normalized query embeddings."""
+
+    def __init__(
+        self,
+        client: genai.Client,
+        threshold: float = 0.92,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = 3600
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            client: genai Client used to embed queries
+            threshold: Minimum cosine similarity for a cached answer to be reused
+            embedding_model: Model used to embed queries
+            max_entries: Maximum cached answers per scope (oldest are evicted first)
+            ttl_seconds: Seconds a cached answer stays reusable (None keeps it indefinitely)
+        """
+        self.client = client
+        self.threshold = threshold
+        self.embedding_model = embedding_model
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # scope -> [(unit-length embedding, response, expiry)], oldest first
+        self._entries: dict = {}
+
+    def embed(self, query: str) -> Optional[List[float]]:
+        """
+        Embed a query and normalize it to unit length.
+
+        Args:
+            query: User query
+
+        Returns:
+            Normalized embedding, or None if embedding failed
+        """
+        try:
+            result = self.client.models.embed_content(
+                model=self.embedding_model,
+                contents=query.strip()
+            )
+            values = result.embeddings[0].values
+        except Exception as e:
+            print(f"⚠️  Could not embed query for semantic cache: {e}")
+            return None
+
+        return _normalize(values)
+
+    def embed_many(self, queries: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed several queries with a single request and normalize them to unit length.
+
+        Args:
+            queries: User queries
+
+        Returns:
+            Normalized embeddings in input order (None for any that failed)
+        """
+        if not queries:
+            return []
+        try:
+            result = self.client.models.embed_content(
+                model=self.embedding_model,
+                contents=[query.strip() for query in queries]
+            )
+            embeddings = [embedding.values for embedding in result.embeddings]
+        except Exception as e:
+            print(f"⚠️  Could not embed queries for semantic cache: {e}")
+            return [None] * len(queries)
+
+        if len(embeddings) != len(queries):
+            print(f"⚠️  Expected {len(queries)} query embeddings, got {len(embeddings)}")
+            return [None] * len(queries)
+        return [_normalize(values) for values in embeddings]
+
+    def lookup(self, scope: Hashable, embedding: List[float]) -> Optional[SearchResponse]:
+        """
+        Find the most similar cached answer within a scope.
+
+        Args:
+            scope: Key separating answers that are not interchangeable
+                (e.g. model, store and generation settings)
+            embedding: Normalized query embedding from embed()
+
+        Returns:
+            Cached SearchResponse if its similarity reaches the threshold, None otherwise
+        """
+        with self._lock:
+            entries = list(self._entries.get(scope, ()))
+
+        now = time.monotonic()
+        best_score, best_response = self.threshold, None
+        for cached_embedding, response, expires_at in entries:
+            if expires_at <= now:
+                continue
+            # Both vectors are unit length, so the dot product is the cosine similarity;
+            # map(mul) keeps the per-dimension multiply-add in C
+            score = sum(map(mul, cached_embedding, embedding))
+            if score >= best_score:
+                best_score, best_response = score, response
+        return best_response
+
+    def match(self, embedding: List[float], candidates: List[Optional[List[float]]]) -> Optional[int]:
+        """
+        Find the candidate embedding most similar to a query embedding.
+
+        Args:
+            embedding: Normalized query embedding
+            candidates: Normalized embeddings to compare against (None entries are skipped)
+
+        Returns:
+            Index of the most similar candidate reaching the threshold, or None
+        """
+        best_score, best_index = self.threshold, None
+        for index, candidate in enumerate(candidates):
+            if candidate is None:
+                continue
+            score = sum(map(mul, candidate, embedding))
+            if score >= best_score:
+                best_score, best_index = score, index
+        return best_index
+
+    def add(self, scope: Hashable, embedding: List[float], response: SearchResponse) -> None:
+        """
+        Cache an answer under a scope.
+
+        Args:
+            scope: Key separating answers that are not interchangeable
+            embedding: Normalized query embedding from embed()
+            response: Response to reuse for similar queries
+        """
+        now = time.monotonic()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds is not None else math.inf
+        with self._lock:
+            entries: List[Tuple[List[float], SearchResponse, float]] = self._entries.setdefault(scope, [])
+            # Entries share one TTL, so expired ones are always at the front
+            expired = 0
+            while expired < len(entries) and entries[expired][2] <= now:
+                expired += 1
+            del entries[:expired]
+            entries.append((embedding, response, expires_at))
+            if len(entries) > self.max_entries:
+                del entries[0]
+
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,215 @@
+"""
+Shared fixtures: fake clients standing in for the Gemini API.
+"""
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Make the repository root importable (src/, config/) without installing it
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def make_response(text, chunks=None, supports=None):
+    """Build a fake generate_content response with optional grounding."""
+    grounding = SimpleNamespace(grounding_chunks=chunks, grounding_supports=supports)
+    return SimpleNamespace(text=text, candidates=[SimpleNamespace(grounding_metadata=grounding)])
+
+def make_chunk(file_name, text):
+    """Build a fake File Search grounding chunk."""
+    return SimpleNamespace(retrieved_context=SimpleNamespace(
+        uri=f"fileSearchStores/demo/documents/{file_name}",
+        title=file_name,
+        text=text
+    ))
+
+def make_support(start_index, chunk_indices):
+    """Build a fake grounding support citing chunks from a byte offset of the text."""
+    return SimpleNamespace(
+        segment=SimpleNamespace(start_index=start_index),
+        grounding_chunk_indices=chunk_indices
+    )
+
+class FakeModels:
+    """Records generate_content / embed_content calls and returns canned results."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generate_calls = []
+        self.embed_calls = []
+        # Called with the prompt; returns the fake response
+        self.respond = lambda contents: make_response(f"answer: {contents}")
+        # Query text -> embedding values
+        self.embeddings = {}
+
+    def generate_content(self, model, contents, config=None):
+        with self.lock:
+            self.generate_calls.append(contents)
+        return self.respond(contents)
+
+    def embed_content(self, model, contents):
+        with self.lock:
+            self.embed_calls.append(contents)
+        texts = contents if isinstance(contents, list) else [contents]
+        return SimpleNamespace(embeddings=[
+            SimpleNamespace(values=self.embeddings[text]) for text in texts
+        ])
+
+class FakeAsyncModels:
+    """Async facade over FakeModels, like client.aio.models."""
+
+    def __init__(self, models):
+        self.models = models
+
+    async def generate_content(self, model, contents, config=None):
+        return self.models.generate_content(model, contents, config)
+
+class FakeFileSearchClient:
+    """The subset of FileSearchClient used by SearchManager, backed by FakeModels."""
+
+    def __init__(self):
+        self.models = FakeModels()
+        self.fingerprint = "v1"
+        # Store display names that don't resolve
+        self.missing_stores = set()
+        # Returned by list_stores, or raised when it is an exception
+        self.stores = []
+
+    def get_client(self):
+        return SimpleNamespace(models=self.models, aio=SimpleNamespace(models=FakeAsyncModels(self.models)))
+
+    def get_store_by_name(self, store_name):
+        if store_name in self.missing_stores:
+            return None
+        return f"fileSearchStores/{store_name}"
+
+    def list_stores(self):
+        if isinstance(self.stores, Exception):
+            raise self.stores
+        return self.stores
+
+    def list_files_in_stores(self, store_names):
+        return {name: () for name in store_names}
+
+    def get_store_fingerprint(self, store_name):
+        return self.fingerprint
+
+class FakeDocumentsAPI:
+    """In-memory stand-in for client.file_search_stores.documents."""
+
+    def __init__(self):
+        # store name -> documents, in upload order
+        self.by_store = {}
+        self.list_calls = 0
+        self.deleted = []
+
+    def add(self, store_name, display_name, custom_metadata=None, state=None):
+        documents = self.by_store.setdefault(store_name, [])
+        document = SimpleNamespace(
+            name=f"{store_name}/documents/doc-{len(documents)}",
+            display_name=display_name,
+            size_bytes=1,
+            state=state,
+            custom_metadata=[
+                SimpleNamespace(key=entry['key'], string_value=entry.get('string_value'))
+                for entry in custom_metadata or []
+            ]
+        )
+        documents.append(document)
+        return document
+
+    def list(self, parent):
+        self.list_calls += 1
+        return list(self.by_store.get(parent, []))
+
+    def delete(self, name, config=None):
+        self.deleted.append(name)
+        for documents in self.by_store.values():
+            documents[:] = [document for document in documents if document.name != name]
+
+class FakeStoresAPI:
+    """In-memory stand-in for client.file_search_stores."""
+
+    def __init__(self):
+        self.documents = FakeDocumentsAPI()
+        self.get_calls = 0
+        self.deleted = []
+        # Uploads finish immediately unless set to False
+        self.uploads_done = True
+
+    def get(self, name):
+        self.get_calls += 1
+        count = len(self.documents.by_store.get(name, []))
+        return SimpleNamespace(
+            name=name, update_time=f"t{count}", active_documents_count=count,
+            pending_documents_count=0, failed_documents_count=0, size_bytes=count
+        )
+
+    def delete(self, name, config=None):
+        self.deleted.append(name)
+        self.documents.by_store.pop(name, None)
+
+    def upload_to_file_search_store(self, file, file_search_store_name, config):
+        self.documents.add(file_search_store_name, config['display_name'], config.get('custom_metadata'))
+        return SimpleNamespace(name=f"operations/{Path(file).name}", done=self.uploads_done)
+
+class FakeOperationsAPI:
+    """Stand-in for client.operations; get() returns the operation unchanged unless told otherwise."""
+
+    def __init__(self):
+        self.get = lambda operation: operation
+
+class FakeGenaiClient:
+    """The parts of genai.Client that FileSearchClient uses for stores and documents."""
+
+    def __init__(self):
+        self.file_search_stores = FakeStoresAPI()
+        self.operations = FakeOperationsAPI()
+
+class FakeClock:
+    """Manually advanced replacement for time.monotonic / time.time; sleeping advances it."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0, seconds)
+
+@pytest.fixture
+def fake_client():
+    return FakeFileSearchClient()
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Settings built from a test API key instead of the developer's environment."""
+    from config.settings import get_settings
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+@pytest.fixture
+def genai_client():
+    return FakeGenaiClient()
+
+@pytest.fixture
+def file_search_client(settings, genai_client):
+    """A real FileSearchClient talking to the in-memory genai fake."""
+    from src.file_search_client import FileSearchClient
+
+    client = FileSearchClient()
+    client.client = genai_client
+    return client
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr("time.monotonic", fake)
+    monkeypatch.setattr("time.time", fake)
+    monkeypatch.setattr("time.sleep", fake.sleep)
+    return fake
@@ -0,0 +1,144 @@
+"""
+Tests for batched searches: query deduplication, result order and answer splitting.
+"""
+import asyncio
+
+from conftest import make_chunk, make_response, make_support
+from src.search_manager import SearchManager
+from src.semantic_cache import SemanticCache
+
+NO_ANSWER = "No answer was returned for this question."
+
+def test_batch_search_keeps_input_order_under_concurrency(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+    queries = [f"question {i}" for i in range(20)]
+
+    results = manager.batch_search(queries, "demo", delay_seconds=0, max_workers=8)
+
+    assert [result.query for result in results] == queries
+    assert all(query in result.answer for query, result in zip(queries, results))
+
+def test_batch_search_answers_repeated_queries_once(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+    queries = ["What is X?", "what is y?", "  what is x?  ", "What is Y?", "What is Z?"]
+
+    results = manager.batch_search(queries, "demo", delay_seconds=0)
+
+    assert len(fake_client.models.generate_calls) == 3
+    assert results[2].answer == results[0].answer
+    assert results[3].answer == results[1].answer
+    # Each result reports the caller's query and can be changed on its own
+    assert [result.query for result in results] == queries
+    results[2].citations.append("extra")
+    assert results[0].citations == []
+
+def test_batch_search_embeds_the_batch_in_one_request(fake_client):
+    fake_client.models.embeddings = {"How do cats sleep?": [1.0, 0.0], "How do dogs bark?": [0.0, 1.0]}
+    manager = SearchManager(
+        fake_client,
+        model_name="test-model",
+        semantic_cache=SemanticCache(fake_client.get_client())
+    )
+
+    manager.batch_search(["How do cats sleep?", "How do dogs bark?", "how do cats sleep?"], "demo", delay_seconds=0)
+
+    assert fake_client.models.embed_calls == [["How do cats sleep?", "How do dogs bark?"]]
+    assert len(fake_client.models.generate_calls) == 2
+
+def test_a_search_and_generate_uses_the_async_client(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+
+    result = asyncio.run(manager.a_search_and_generate("What is X?", "demo"))
+
+    assert "What is X?" in result.answer
+    assert len(fake_client.models.generate_calls) == 1
+
+def test_a_batch_search_dedupes_and_keeps_order(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+    queries = ["alpha", "beta", "ALPHA", "gamma"]
+
+    results = asyncio.run(manager.a_batch_search(queries, "demo", delay_seconds=0))
+
+    assert len(fake_client.models.generate_calls) == 3
+    assert all(query in result.answer for query, result in zip(["alpha", "beta", "alpha", "gamma"], results))
+    assert results[2].answer == results[0].answer
+    assert [result.query for result in results] == queries
+
+def test_non_positive_concurrency_is_clamped(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+
+    assert len(manager.batch_search(["a", "b"], "demo", delay_seconds=0, max_workers=0)) == 2
+
+    # Semaphore(0) would never let a query start
+    results = asyncio.run(asyncio.wait_for(
+        manager.a_batch_search(["a", "b"], "demo", delay_seconds=0, max_concurrency=0), timeout=5
+    ))
+    assert len(results) == 2
+
+def test_batch_search_merges_near_duplicates_with_semantic_cache(fake_client):
+    fake_client.models.embeddings = {
+        "How do cats sleep?": [1.0, 0.0],
+        "How do felines sleep?": [0.99, 0.1],
+        "How do dogs bark?": [0.0, 1.0],
+    }
+    manager = SearchManager(
+        fake_client,
+        model_name="test-model",
+        semantic_cache=SemanticCache(fake_client.get_client())
+    )
+
+    results = manager.batch_search(list(fake_client.models.embeddings), "demo", delay_seconds=0)
+
+    # One generation per distinct question
+    assert len(fake_client.models.generate_calls) == 2
+    assert results[1].answer == results[0].answer
+    assert results[1].query == "How do felines sleep?"
+    assert results[1] is not results[0]
+    assert "How do dogs bark?" in results[2].answer
+
+def test_split_batch_answers_at_line_starts(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+    text = "Here are the answers:\n[1] First answer.\n\n[2] Second answer.\n[3] Third."
+
+    assert manager._split_batch_answers(text, 3) == ["First answer.", "Second answer.", "Third."]
+
+def test_split_batch_answers_with_inline_labels(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+
+    assert manager._split_batch_answers("[1] a [2] b", 2) == ["a", "b"]
+
+def test_split_batch_answers_with_missing_labels(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+
+    assert manager._split_batch_answers("[1] a\n[3] c", 3) == ["a", NO_ANSWER, "c"]
+    assert manager._split_batch_answers("no labels at all", 2) == [NO_ANSWER, NO_ANSWER]
+    assert manager._split_batch_answers("", 1) == [NO_ANSWER]
+
+def test_split_batch_answers_ignores_references_inside_answers(fake_client):
+    manager = SearchManager(fake_client, model_name="test-model")
+    text = "[1] See [1] and [3] for details.\n[2] b\n[3] c\n[4] out of range"
+
+    assert manager._split_batch_answers(text, 3) == ["See [1] and [3] for details.", "b", "c\n[4] out of range"]
+
+def test_batch_prompt_assigns_citations_per_answer(fake_client):
+    text = "[1] Cats nap. [2] Dogs bark."
+    chunks = [make_chunk("cats.txt", "cats nap a lot"), make_chunk("dogs.txt", "dogs bark loudly")]
+    supports = [make_support(text.index("Cats"), [0]), make_support(text.index("Dogs"), [1])]
+    fake_client.models.respond = lambda contents: make_response(text, chunks, supports)
+    manager = SearchManager(fake_client, model_name="test-model")
+
+    results = manager.batch_prompt(["Do cats nap?", "Do dogs bark?", "Do fish swim?"], "demo")
+
+    assert [result.answer for result in results] == ["Cats nap.", "Dogs bark.", NO_ANSWER]
+    assert [[c.file_name for c in result.citations] for result in results] == [
+        ["cats.txt"], ["dogs.txt"], []
+    ]
+
+def test_batch_prompt_tolerates_a_response_without_text(fake_client):
+    fake_client.models.respond = lambda contents: make_response(None)
+    manager = SearchManager(fake_client, model_name="test-model")
+
+    results = manager.batch_prompt(["Do cats nap?", "Do dogs bark?"], "demo")
+
+    assert [result.answer for result in results] == [NO_ANSWER, NO_ANSWER]
+    assert all(result.error is None for result in results)
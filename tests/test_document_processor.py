@@ -0,0 +1,118 @@
+"""
+Tests for DocumentProcessor validation and directory uploads.
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from src.document_processor import DocumentProcessor
+
+@pytest.fixture
+def processor(file_search_client):
+    return DocumentProcessor(file_search_client)
+
+def test_regular_supported_file_is_valid(processor, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("hello")
+
+    is_valid, error, file_stat = processor._validate(str(path))
+
+    assert (is_valid, error) == (True, "")
+    assert file_stat.st_size == 5
+
+def test_symlinks_are_rejected(processor, tmp_path):
+    target = tmp_path / "notes.txt"
+    target.write_text("hello")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    is_valid, error = processor.validate_file(str(link))
+
+    assert not is_valid
+    assert error.startswith("Not a regular file")
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs FIFOs")
+def test_fifos_are_rejected(processor, tmp_path):
+    fifo = tmp_path / "pipe.txt"
+    os.mkfifo(fifo)
+
+    assert processor.validate_file(str(fifo)) == (False, f"Not a regular file: {fifo}")
+
+def test_missing_and_unsupported_files_are_rejected(processor, tmp_path):
+    binary = tmp_path / "image.bmp"
+    binary.write_bytes(b"BM")
+
+    assert processor.validate_file(str(tmp_path / "missing.txt"))[0] is False
+    assert processor.validate_file(str(binary))[1].startswith("Unsupported file format")
+
+def test_directory_upload_skips_symlinks(processor, genai_client, tmp_path):
+    (tmp_path / "notes.txt").write_text("hello")
+    (tmp_path / "link.txt").symlink_to(tmp_path / "notes.txt")
+
+    processor.upload_directory(str(tmp_path), "fileSearchStores/docs")
+
+    uploaded = genai_client.file_search_stores.documents.list("fileSearchStores/docs")
+    assert [document.display_name for document in uploaded] == ["notes.txt"]
+
+def finish_only(*names):
+    """operations.get replacement that completes only the named operations."""
+    return lambda operation: SimpleNamespace(name=operation.name, done=operation.name in names)
+
+def test_timed_out_uploads_are_reported_per_file(processor, genai_client, clock, tmp_path, capsys):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(name)
+    genai_client.file_search_stores.uploads_done = False
+    genai_client.operations.get = finish_only("operations/a.txt")
+
+    assert processor.upload_directory(str(tmp_path), "fileSearchStores/docs") == ["operations/a.txt"]
+    assert f"Upload of {tmp_path / 'b.txt'} still processing" in capsys.readouterr().out
+
+def test_polling_failure_skips_only_its_batch(processor, genai_client, clock, tmp_path, capsys):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(name)
+    genai_client.file_search_stores.uploads_done = False
+
+    def flaky_get(operation):
+        if operation.name == "operations/a.txt":
+            raise ConnectionError("connection reset")
+        return SimpleNamespace(name=operation.name, done=True)
+
+    genai_client.operations.get = flaky_get
+
+    # One file per batch, so b.txt is still confirmed after a.txt's poll fails
+    assert processor.upload_directory(str(tmp_path), "fileSearchStores/docs", batch_size=1) == ["operations/b.txt"]
+    assert "Could not confirm 1 upload(s)" in capsys.readouterr().out
+
+def test_non_positive_max_workers_is_clamped(processor, tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+
+    assert processor.upload_directory(str(tmp_path), "fileSearchStores/docs", max_workers=-1) == ["operations/a.txt"]
+
+def test_skip_unchanged_uploads_only_new_or_changed_files(processor, genai_client, tmp_path):
+    (tmp_path / "a.txt").write_text("first")
+    (tmp_path / "b.txt").write_text("second")
+    store = "fileSearchStores/docs"
+
+    assert len(processor.upload_directory(str(tmp_path), store, skip_unchanged=True)) == 2
+    assert processor.upload_directory(str(tmp_path), store, skip_unchanged=True) == []
+
+    old_b = [d.name for d in genai_client.file_search_stores.documents.list(store) if d.display_name == "b.txt"]
+    (tmp_path / "b.txt").write_text("second, edited")
+    assert processor.upload_directory(str(tmp_path), store, skip_unchanged=True) == ["operations/b.txt"]
+
+    # The edited file replaces its previous document instead of sitting next to it
+    documents = genai_client.file_search_stores.documents.list(store)
+    assert sorted(d.display_name for d in documents) == ["a.txt", "b.txt"]
+    assert genai_client.file_search_stores.documents.deleted == old_b
+
+def test_unfinished_reupload_keeps_the_previous_document(processor, genai_client, clock, tmp_path):
+    (tmp_path / "a.txt").write_text("first")
+    store = "fileSearchStores/docs"
+    processor.upload_directory(str(tmp_path), store, skip_unchanged=True)
+
+    (tmp_path / "a.txt").write_text("first, edited")
+    genai_client.file_search_stores.uploads_done = False
+    assert processor.upload_directory(str(tmp_path), store, skip_unchanged=True) == []
+
+    assert genai_client.file_search_stores.documents.deleted == []
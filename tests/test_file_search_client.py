@@ -0,0 +1,133 @@
+"""
+Tests for FileSearchClient's cached store file listings and indexing waits.
+"""
+from google.genai import types
+
+from src.file_search_client import FILES_CACHE_TTL_SECONDS
+
+STORE = "fileSearchStores/docs"
+
+def test_file_listing_is_cached(file_search_client, genai_client, clock):
+    genai_client.file_search_stores.documents.add(STORE, "a.txt")
+
+    first = file_search_client.list_files_in_store(STORE)
+    second = file_search_client.list_files_in_store(STORE)
+
+    assert [info['display_name'] for info in second] == ["a.txt"]
+    assert second == first
+    assert genai_client.file_search_stores.documents.list_calls == 1
+
+def test_file_listing_expires(file_search_client, genai_client, clock):
+    file_search_client.list_files_in_store(STORE)
+    genai_client.file_search_stores.documents.add(STORE, "a.txt")
+
+    clock.now += FILES_CACHE_TTL_SECONDS - 1
+    assert file_search_client.list_files_in_store(STORE) == ()
+
+    clock.now += 1
+    assert len(file_search_client.list_files_in_store(STORE)) == 1
+    assert genai_client.file_search_stores.documents.list_calls == 2
+
+def test_refresh_bypasses_the_cache(file_search_client, genai_client, clock):
+    file_search_client.list_files_in_store(STORE)
+    genai_client.file_search_stores.documents.add(STORE, "a.txt")
+
+    assert len(file_search_client.list_files_in_store(STORE, refresh=True)) == 1
+
+def test_upload_invalidates_the_listing(file_search_client, genai_client, clock, tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("hello")
+    file_search_client.list_files_in_store(STORE)
+
+    file_search_client.upload_document(str(path), STORE)
+
+    assert [info['display_name'] for info in file_search_client.list_files_in_store(STORE)] == ["a.txt"]
+
+def test_delete_invalidates_the_listing(file_search_client, genai_client, clock):
+    genai_client.file_search_stores.documents.add(STORE, "a.txt")
+    file_search_client.list_files_in_store(STORE)
+
+    file_search_client.delete_store(STORE)
+
+    assert file_search_client.list_files_in_store(STORE) == ()
+
+def test_cached_listing_is_shared_and_immutable(file_search_client, genai_client, clock):
+    genai_client.file_search_stores.documents.add(STORE, "a.txt")
+
+    first = file_search_client.list_files_in_store(STORE)
+
+    assert isinstance(first, tuple)
+    assert file_search_client.list_files_in_store(STORE) is first
+
+def test_version_changes_only_when_a_listing_changes(file_search_client, genai_client, clock):
+    file_search_client.list_files_in_store(STORE)
+    version = file_search_client.get_version()
+
+    # An identical refetch leaves the version alone
+    file_search_client.list_files_in_store(STORE, refresh=True)
+    assert file_search_client.get_version() == version
+
+    genai_client.file_search_stores.documents.add(STORE, "a.txt")
+    file_search_client.list_files_in_store(STORE, refresh=True)
+    assert file_search_client.get_version() > version
+
+def test_version_changes_on_upload_and_delete(file_search_client, clock, tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("hello")
+
+    version = file_search_client.get_version()
+    file_search_client.upload_document(str(path), STORE)
+    assert file_search_client.get_version() > version
+
+    version = file_search_client.get_version()
+    file_search_client.delete_store(STORE)
+    assert file_search_client.get_version() > version
+
+def test_store_fingerprint_is_memoized_and_dropped_on_upload(file_search_client, genai_client, clock, tmp_path):
+    first = file_search_client.get_store_fingerprint(STORE)
+    assert file_search_client.get_store_fingerprint(STORE) == first
+    assert genai_client.file_search_stores.get_calls == 1
+
+    path = tmp_path / "a.txt"
+    path.write_text("hello")
+    file_search_client.upload_document(str(path), STORE)
+
+    assert file_search_client.get_store_fingerprint(STORE) != first
+    assert genai_client.file_search_stores.get_calls == 2
+
+def test_failed_fingerprint_fetch_is_memoized(file_search_client, genai_client, clock):
+    def unavailable(name):
+        genai_client.file_search_stores.get_calls += 1
+        raise ConnectionError("unavailable")
+
+    genai_client.file_search_stores.get = unavailable
+
+    assert file_search_client.get_store_fingerprint(STORE) is None
+    assert file_search_client.get_store_fingerprint(STORE) is None
+    assert genai_client.file_search_stores.get_calls == 1
+
+    clock.now += FILES_CACHE_TTL_SECONDS
+    file_search_client.get_store_fingerprint(STORE)
+    assert genai_client.file_search_stores.get_calls == 2
+
+def test_wait_for_indexing_treats_only_pending_as_not_ready(file_search_client, genai_client, clock):
+    documents = genai_client.file_search_stores.documents
+    documents.add(STORE, "a.txt", state=types.DocumentState.STATE_ACTIVE)
+    documents.add(STORE, "b.txt", state=types.DocumentState.STATE_UNSPECIFIED)
+    pending = documents.add(STORE, "c.txt", state=types.DocumentState.STATE_PENDING)
+    start = clock.now
+
+    assert file_search_client.wait_for_indexing(STORE, expected_count=3, timeout=2, interval=1) is False
+    assert clock.now - start >= 2
+
+    pending.state = types.DocumentState.STATE_ACTIVE
+    assert file_search_client.wait_for_indexing(STORE, expected_count=3) is True
+
+def test_wait_for_indexing_stops_at_the_first_failure(file_search_client, genai_client, clock):
+    documents = genai_client.file_search_stores.documents
+    documents.add(STORE, "a.txt", state=types.DocumentState.STATE_PENDING)
+    documents.add(STORE, "b.txt", state=types.DocumentState.STATE_FAILED)
+    start = clock.now
+
+    assert file_search_client.wait_for_indexing(STORE, expected_count=2, timeout=30) is False
+    assert clock.now == start
@@ -0,0 +1,65 @@
+"""
+Tests for the CLI exit codes.
+"""
+import pytest
+
+import main
+
+@pytest.fixture
+def run_cli(monkeypatch, settings, fake_client):
+    """Run main() with the given arguments against the fake client and return its exit code."""
+    monkeypatch.setattr("src.file_search_client.FileSearchClient", lambda: fake_client)
+
+    def run(*args):
+        monkeypatch.setattr("sys.argv", ["main.py", *args])
+        return main.main()
+
+    return run
+
+def failing_generation(contents):
+    raise RuntimeError("quota exceeded")
+
+def test_search_succeeds(run_cli):
+    assert run_cli("search", "What is X?", "docs") == 0
+
+def test_search_in_unknown_store_fails(run_cli, fake_client):
+    fake_client.missing_stores.add("nope")
+
+    assert run_cli("search", "What is X?", "nope") == 1
+
+def test_search_fails_when_generation_fails(run_cli, fake_client):
+    fake_client.models.respond = failing_generation
+
+    assert run_cli("search", "What is X?", "docs") == 1
+
+def test_ask_fails_when_generation_fails(run_cli, fake_client):
+    assert run_cli("ask", "What is X?", "docs") == 0
+
+    fake_client.models.respond = failing_generation
+    assert run_cli("ask", "What is X?", "docs") == 1
+    assert run_cli("ask", "What is X?", "What is Y?", "docs") == 1
+
+def test_summarize_in_unknown_store_fails(run_cli, fake_client):
+    fake_client.missing_stores.add("nope")
+
+    assert run_cli("summarize", "docs") == 0
+    assert run_cli("summarize", "nope") == 1
+
+def test_list_stores(run_cli, fake_client):
+    assert run_cli("list-stores") == 0
+
+    fake_client.stores = [{'name': "fileSearchStores/docs", 'display_name': "docs"}]
+    assert run_cli("list-stores") == 0
+
+    fake_client.stores = RuntimeError("permission denied")
+    assert run_cli("list-stores") == 1
+
+def test_usage_errors(run_cli):
+    assert run_cli("frobnicate") == 2
+    assert run_cli("search", "only a query") == 2
+
+def test_persistent_cache_is_opt_in(run_cli, monkeypatch, tmp_path):
+    monkeypatch.setattr("src.response_cache.DEFAULT_CACHE_PATH", tmp_path / "responses.sqlite3")
+
+    assert main.RAGSystemCLI().search_manager.cache is None
+    assert main.RAGSystemCLI(use_cache=True).search_manager.cache is not None
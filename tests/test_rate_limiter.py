@@ -0,0 +1,32 @@
+"""
+Tests for the token-bucket limiter used by batch searches.
+"""
+import pytest
+
+from src.search_manager import _RateLimiter
+
+def test_requests_are_spaced_by_interval(clock):
+    limiter = _RateLimiter(interval=1.0)
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 1.0, 2.0]
+
+def test_burst_starts_immediately_then_spaces(clock):
+    limiter = _RateLimiter(interval=0.5, burst=3)
+    assert [limiter.reserve() for _ in range(5)] == [0.0, 0.0, 0.0, 0.5, 1.0]
+
+def test_waits_count_from_current_time(clock):
+    limiter = _RateLimiter(interval=1.0)
+    limiter.reserve()
+    limiter.reserve()
+    clock.now += 0.25
+    assert limiter.reserve() == pytest.approx(1.75)
+
+def test_idle_time_refills_the_bucket(clock):
+    limiter = _RateLimiter(interval=1.0, burst=2)
+    for _ in range(4):
+        limiter.reserve()
+    clock.now += 100
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+def test_burst_below_one_is_clamped(clock):
+    limiter = _RateLimiter(interval=1.0, burst=0)
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 1.0]
@@ -0,0 +1,109 @@
+"""
+Tests for the SQLite response cache.
+"""
+from conftest import make_response
+from src.response_cache import ResponseCache
+from src.response_handler import Citation, SearchResponse
+from src.search_manager import SearchManager
+
+def make_search_response(**overrides):
+    fields = dict(
+        answer="Cats sleep a lot.",
+        citations=[Citation(file_name="cats.txt", chunk_text="cats nap", page_number=3, score=0.9)],
+        model_used="test-model",
+        query="Do cats sleep?",
+        raw_response=object(),
+        grounding_metadata={'support_score': None, 'grounding_chunks_count': 1}
+    )
+    fields.update(overrides)
+    return SearchResponse(**fields)
+
+def test_round_trip(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    key = ResponseCache.make_key("test-model", "store", "Do cats sleep?")
+    cache.set(key, make_search_response())
+
+    cached = cache.get(key)
+
+    # Everything but the raw API response survives
+    assert cached == make_search_response(raw_response=None)
+
+def test_round_trip_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    ResponseCache(path).set("key", make_search_response())
+
+    assert ResponseCache(path).get("key").answer == "Cats sleep a lot."
+
+def test_missing_key(tmp_path):
+    assert ResponseCache(tmp_path / "cache.sqlite3").get("missing") is None
+
+def test_make_key_is_stable_and_distinguishes_parts():
+    assert ResponseCache.make_key("a", 1, None) == ResponseCache.make_key("a", 1, None)
+    assert ResponseCache.make_key("a", 1) != ResponseCache.make_key("a", 2)
+
+def test_expired_entries_are_dropped(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", ttl_seconds=60)
+    cache.set("key", make_search_response())
+
+    clock.now += 59
+    assert cache.get("key") is not None
+
+    clock.now += 2
+    assert cache.get("key") is None
+    count = cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    assert count == 0
+
+def test_search_is_answered_from_cache(tmp_path, fake_client):
+    manager = SearchManager(fake_client, model_name="test-model", cache=ResponseCache(tmp_path / "c.sqlite3"))
+
+    first = manager.search_and_generate("Do cats sleep?", "demo")
+    second = manager.search_and_generate("  Do cats sleep? ", "demo")
+
+    assert len(fake_client.models.generate_calls) == 1
+    assert second.answer == first.answer
+
+def test_queries_differing_in_case_are_cached_separately(tmp_path, fake_client):
+    manager = SearchManager(fake_client, model_name="test-model", cache=ResponseCache(tmp_path / "c.sqlite3"))
+
+    manager.search_and_generate("What does getID return?", "demo")
+    manager.search_and_generate("What does getId return?", "demo")
+
+    assert len(fake_client.models.generate_calls) == 2
+
+def test_failed_responses_are_not_cached(tmp_path, fake_client):
+    # A response whose text can't be read makes process_response fall back to an error
+    class Unreadable:
+        candidates = None
+
+        @property
+        def text(self):
+            raise ValueError("blocked")
+
+    fake_client.models.respond = lambda contents: Unreadable()
+    manager = SearchManager(fake_client, model_name="test-model", cache=ResponseCache(tmp_path / "c.sqlite3"))
+
+    assert manager.search_and_generate("Do cats sleep?", "demo").error is not None
+
+    fake_client.models.respond = lambda contents: make_response("Cats sleep a lot.")
+    assert manager.search_and_generate("Do cats sleep?", "demo").answer == "Cats sleep a lot."
+    assert len(fake_client.models.generate_calls) == 2
+
+def test_cached_answers_stop_matching_when_the_store_changes(tmp_path, fake_client):
+    manager = SearchManager(fake_client, model_name="test-model", cache=ResponseCache(tmp_path / "c.sqlite3"))
+
+    manager.search_and_generate("Do cats sleep?", "demo")
+    fake_client.fingerprint = "v2"
+    manager.search_and_generate("Do cats sleep?", "demo")
+
+    assert len(fake_client.models.generate_calls) == 2
+
+def test_search_skips_cache_without_store_fingerprint(tmp_path, fake_client):
+    fake_client.fingerprint = None
+    cache = ResponseCache(tmp_path / "c.sqlite3")
+    manager = SearchManager(fake_client, model_name="test-model", cache=cache)
+
+    manager.search_and_generate("Do cats sleep?", "demo")
+    manager.search_and_generate("Do cats sleep?", "demo")
+
+    assert len(fake_client.models.generate_calls) == 2
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 0
@@ -0,0 +1,129 @@
+"""
+Tests for the embedding-similarity cache.
+"""
+from types import SimpleNamespace
+
+from src.response_handler import SearchResponse
+from src.search_manager import SearchManager
+from src.semantic_cache import SemanticCache
+
+CATS = [1.0, 0.0]
+FELINES = [0.995, 0.0998]
+DOGS = [0.0, 1.0]
+
+def make_search_response(query):
+    return SearchResponse(answer=f"answer to {query}", citations=[], model_used="test-model", query=query)
+
+def make_cache(**kwargs):
+    # lookup/add never embed, so no API client is needed
+    return SemanticCache(SimpleNamespace(), **kwargs)
+
+def test_lookup_matches_similar_embeddings_within_scope(clock):
+    cache = make_cache()
+    response = make_search_response("cats")
+    cache.add("scope", CATS, response)
+
+    assert cache.lookup("scope", FELINES) is response
+    assert cache.lookup("scope", DOGS) is None
+    assert cache.lookup("other scope", CATS) is None
+
+def test_oldest_entry_is_evicted_past_max_entries(clock):
+    cache = make_cache(max_entries=2)
+    cache.add("scope", CATS, make_search_response("cats"))
+    cache.add("scope", DOGS, make_search_response("dogs"))
+    cache.add("scope", [0.7071, -0.7071], make_search_response("birds"))
+
+    assert cache.lookup("scope", CATS) is None
+    assert cache.lookup("scope", DOGS).query == "dogs"
+
+def test_embed_normalizes_and_tolerates_failures(fake_client):
+    fake_client.models.embeddings = {"cats": [3.0, 4.0], "zero": [0.0, 0.0]}
+    cache = SemanticCache(fake_client.get_client())
+
+    assert cache.embed("  cats ") == [0.6, 0.8]
+    assert cache.embed("zero") is None
+    # An unknown query makes the fake API raise
+    assert cache.embed("unknown") is None
+
+def test_search_reuses_the_answer_to_a_rephrased_query(fake_client):
+    fake_client.models.embeddings = {"How do cats sleep?": CATS, "How do felines sleep?": FELINES}
+    manager = SearchManager(
+        fake_client,
+        model_name="test-model",
+        semantic_cache=SemanticCache(fake_client.get_client())
+    )
+
+    first = manager.search_and_generate("How do cats sleep?", "demo")
+    second = manager.search_and_generate("How do felines sleep?", "demo")
+
+    assert second.answer == first.answer
+    assert len(fake_client.models.generate_calls) == 1
+
+def test_entries_expire_after_ttl(clock):
+    cache = make_cache(ttl_seconds=10)
+    cache.add("scope", CATS, make_search_response("cats"))
+
+    clock.now += 9
+    assert cache.lookup("scope", CATS) is not None
+
+    clock.now += 1
+    assert cache.lookup("scope", CATS) is None
+
+def test_expired_entries_are_pruned_on_add(clock):
+    cache = make_cache(ttl_seconds=10)
+    cache.add("scope", CATS, make_search_response("cats"))
+    clock.now += 20
+    cache.add("scope", DOGS, make_search_response("dogs"))
+
+    assert len(cache._entries["scope"]) == 1
+
+def test_no_ttl_keeps_entries(clock):
+    cache = make_cache(ttl_seconds=None)
+    cache.add("scope", CATS, make_search_response("cats"))
+    clock.now += 10 ** 9
+
+    assert cache.lookup("scope", CATS) is not None
+
+def test_no_cache_bypasses_the_semantic_cache(fake_client):
+    fake_client.models.embeddings = {"How do cats sleep?": CATS}
+    manager = SearchManager(
+        fake_client,
+        model_name="test-model",
+        semantic_cache=SemanticCache(fake_client.get_client())
+    )
+
+    manager.search_and_generate("How do cats sleep?", "demo", no_cache=True)
+    manager.search_and_generate("How do cats sleep?", "demo", no_cache=True)
+
+    assert len(fake_client.models.generate_calls) == 2
+    assert fake_client.models.embed_calls == []
+
+def test_lookup_returns_the_closest_entry_at_or_above_threshold(clock):
+    cache = make_cache(threshold=0.5)
+    cache.add("scope", FELINES, make_search_response("felines"))
+    cats = make_search_response("cats")
+    cache.add("scope", CATS, cats)
+    cache.add("scope", DOGS, make_search_response("dogs"))
+
+    assert cache.lookup("scope", CATS) is cats
+    # Exactly at the threshold still counts
+    assert make_cache(threshold=1.0).lookup("scope", CATS) is None
+    exact = make_cache(threshold=1.0)
+    exact.add("scope", CATS, cats)
+    assert exact.lookup("scope", CATS) is cats
+
+def test_embed_many_normalizes_and_tolerates_failures(fake_client):
+    fake_client.models.embeddings = {"cats": [3.0, 4.0], "zero": [0.0, 0.0]}
+    cache = SemanticCache(fake_client.get_client())
+
+    assert cache.embed_many(["cats", "zero"]) == [[0.6, 0.8], None]
+    assert len(fake_client.models.embed_calls) == 1
+    # An unknown query makes the fake API raise; every embedding is then unavailable
+    assert cache.embed_many(["cats", "unknown"]) == [None, None]
+    assert cache.embed_many([]) == []
+
+def test_match_returns_closest_candidate_index():
+    cache = make_cache()
+
+    assert cache.match(FELINES, [DOGS, None, CATS]) == 2
+    assert cache.match(DOGS, [CATS, None]) is None